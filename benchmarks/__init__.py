@@ -0,0 +1 @@
+"""Benchmarks for the petTracer integration."""
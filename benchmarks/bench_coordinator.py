@@ -0,0 +1,327 @@
+"""Benchmark the petTracer coordinator and platforms against the fake API.
+
+Sets the integration up in a throwaway Home Assistant instance, polls the
+fake API a number of times and reports per poll:
+
+- refresh latency (wall clock, including the simulated network latency)
+- entity state writes
+- recorder rows and attribute bytes, as the recorder would store them
+- CPU time spent on the Home Assistant loop thread
+- memory retained per collar, measured in a second pass with tracemalloc
+
+Run from the repository root::
+
+    python -m benchmarks.bench_coordinator --collars 200 --polls 30
+
+Use ``--json`` to write the summary for comparison against a baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import ExitStack
+from datetime import timedelta
+import json
+import logging
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.components.recorder.db_schema import StateAttributes
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers import frame
+from homeassistant.helpers.entity import Entity
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.pettracer import device_tracker, sensor  # noqa: F401
+from custom_components.pettracer.const import CONF_LEAN_ATTRIBUTES, DOMAIN
+
+from .fake_api import FakePetTracerApi, patch_client_urls
+
+
+class WriteCounter:
+    """Count calls to Entity.async_write_ha_state."""
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.count = 0
+        self._original = Entity.async_write_ha_state
+
+    def patch(self) -> Any:
+        """Return a patcher that counts state writes."""
+        counter = self
+
+        def async_write_ha_state(entity: Entity) -> None:
+            counter.count += 1
+            counter._original(entity)
+
+        return patch.object(Entity, "async_write_ha_state", async_write_ha_state)
+
+
+class RecorderEstimate:
+    """Count what the recorder would store for state changes.
+
+    Every state change is a row in the states table. Attributes, without the
+    unrecorded ones, are stored once per distinct set and shared by the rows.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.rows = 0
+        self.attribute_bytes = 0
+        self._seen: set[bytes] = set()
+
+    def listen(self, hass: HomeAssistant) -> None:
+        """Start counting state changes."""
+
+        def state_changed(event: Event) -> None:
+            if not event.data["entity_id"].startswith(("sensor.", "device_tracker.")):
+                return
+            self.rows += 1
+            shared = StateAttributes.shared_attrs_bytes_from_event(event, None)
+            if shared not in self._seen:
+                self._seen.add(shared)
+                self.attribute_bytes += len(shared)
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, state_changed)
+
+    def reset(self) -> None:
+        """Start over, keeping the attribute sets already stored."""
+        self.rows = 0
+        self.attribute_bytes = 0
+
+
+async def run_scenario(
+    args: argparse.Namespace, measure_memory: bool
+) -> dict[str, Any]:
+    """Set up the integration and poll the fake API, return the measurements."""
+    api = FakePetTracerApi(
+        collars=args.collars,
+        moving=args.moving,
+        latency=args.latency,
+        jitter=args.jitter,
+    )
+    url = api.start()
+    writes = WriteCounter()
+    recorder = RecorderEstimate()
+    results: dict[str, Any] = {
+        "latency": [],
+        "cpu": [],
+        "writes": [],
+        "failures": 0,
+    }
+
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as config_dir:
+        stack.enter_context(patch_client_urls(url))
+        stack.enter_context(writes.patch())
+        if args.capture:
+            # Stamp captured requests with the simulated time of the fake API
+            stack.enter_context(
+                patch(
+                    "custom_components.pettracer.capture.time",
+                    SimpleNamespace(time=lambda: api.time.timestamp()),
+                )
+            )
+        if args.unlimited:
+            # Lift the request limits to measure the integration alone
+            stack.enter_context(
+                patch("custom_components.pettracer.scheduler.REQUEST_RATE", 1e9)
+            )
+            stack.enter_context(
+                patch(
+                    "custom_components.pettracer.scheduler.MAX_CONCURRENT_REQUESTS", 64
+                )
+            )
+
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            frame.async_setup(hass)
+            recorder.listen(hass)
+            # Load the integration from the repository
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={CONF_USERNAME: "bench@example.com", CONF_PASSWORD: "bench"},
+                options={CONF_LEAN_ATTRIBUTES: args.lean},
+                # Polls are driven by the benchmark
+                pref_disable_polling=True,
+            )
+            entry.add_to_hass(hass)
+
+            if measure_memory:
+                # The platforms are imported up front, so only what the
+                # integration keeps per collar is counted
+                tracemalloc.start()
+                baseline = tracemalloc.take_snapshot()
+
+            started = time.perf_counter()
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            results["setup"] = time.perf_counter() - started
+            results["setup_writes"] = writes.count
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+            if args.capture and not measure_memory:
+                # Record the polls, for benchmarks.replay
+                coordinator.scheduler.capture.async_start(
+                    hass, args.capture.resolve(), timedelta(days=1)
+                )
+            # Failures are only injected into the polls, setup has to succeed
+            api.error_rate = args.error_rate
+            recorder.reset()
+
+            for _ in range(args.polls):
+                api.advance(args.step)
+                writes.count = 0
+                wall = time.perf_counter()
+                cpu = time.thread_time()
+                await coordinator.async_refresh()
+                await hass.async_block_till_done()
+                results["cpu"].append(time.thread_time() - cpu)
+                results["latency"].append(time.perf_counter() - wall)
+                results["writes"].append(writes.count)
+                if not coordinator.last_update_success:
+                    results["failures"] += 1
+
+            if measure_memory:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                retained = sum(
+                    stat.size_diff
+                    for stat in snapshot.compare_to(baseline, "filename")
+                )
+                results["memory_per_collar"] = retained / args.collars
+
+            if args.capture and not measure_memory:
+                await coordinator.scheduler.capture.async_stop()
+            results["recorder_rows"] = recorder.rows
+            results["recorder_bytes"] = recorder.attribute_bytes
+            results["requests"] = dict(api.requests)
+            results["bytes_received"] = api.bytes_sent
+            await hass.config_entries.async_unload(entry.entry_id)
+
+    api.stop()
+    return results
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    """Return the median, 95th percentile and maximum of some values."""
+    if not values:
+        return {"median": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "median": statistics.median(ordered),
+        "p95": ordered[min(round(len(ordered) * 0.95), len(ordered) - 1)],
+        "max": ordered[-1],
+    }
+
+
+async def async_main(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the benchmark and return the summary."""
+    timing = await run_scenario(args, measure_memory=False)
+    # Scale the recorder counts from the simulated time to a day per collar
+    per_collar_day = 86400 / (args.polls * args.step) / args.collars
+    summary: dict[str, Any] = {
+        "collars": args.collars,
+        "polls": args.polls,
+        "setup_seconds": timing["setup"],
+        "setup_writes": timing["setup_writes"],
+        "refresh_seconds": _summary(timing["latency"]),
+        "cpu_seconds": _summary(timing["cpu"]),
+        "writes_per_poll": _summary(timing["writes"]),
+        "failed_polls": timing["failures"],
+        "recorder_rows_per_collar_day": timing["recorder_rows"] * per_collar_day,
+        "recorder_attribute_bytes_per_collar_day": timing["recorder_bytes"]
+        * per_collar_day,
+        "requests": timing["requests"],
+        "bytes_received": timing["bytes_received"],
+    }
+    if not args.no_memory:
+        memory = await run_scenario(args, measure_memory=True)
+        summary["memory_bytes_per_collar"] = memory["memory_per_collar"]
+    return summary
+
+
+def _report(summary: dict[str, Any]) -> str:
+    """Format the summary as a table."""
+    lines = [
+        (
+            f"collars: {summary['collars']}, polls: {summary['polls']}, "
+            f"failed polls: {summary['failed_polls']}"
+        ),
+        (
+            f"setup: {summary['setup_seconds'] * 1000:.1f} ms, "
+            f"{summary['setup_writes']} state writes"
+        ),
+        f"{'':24}{'median':>10}{'p95':>10}{'max':>10}",
+    ]
+    for label, key, scale in (
+        ("refresh latency (ms)", "refresh_seconds", 1000),
+        ("cpu per refresh (ms)", "cpu_seconds", 1000),
+        ("state writes per poll", "writes_per_poll", 1),
+    ):
+        row = summary[key]
+        lines.append(
+            f"{label:24}{row['median'] * scale:>10.1f}"
+            f"{row['p95'] * scale:>10.1f}{row['max'] * scale:>10.1f}"
+        )
+    lines.append(
+        f"recorder per collar and day: "
+        f"{summary['recorder_rows_per_collar_day']:.0f} rows, "
+        f"{summary['recorder_attribute_bytes_per_collar_day'] / 1024:.1f} KiB "
+        "attributes"
+    )
+    if "memory_bytes_per_collar" in summary:
+        memory = summary["memory_bytes_per_collar"] / 1024
+        lines.append(f"memory per collar: {memory:.1f} KiB")
+    lines.append(
+        "requests: "
+        + ", ".join(f"{path} {count}" for path, count in summary["requests"].items())
+    )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collars", type=int, default=100)
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--moving", type=float, default=0.3, help="share moving")
+    parser.add_argument("--step", type=float, default=60, help="seconds per poll")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--lean", action="store_true", help="enable lean tracker attributes"
+    )
+    parser.add_argument(
+        "--unlimited", action="store_true", help="lift the request rate limits"
+    )
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--json", type=Path, help="write the summary here")
+    parser.add_argument(
+        "--capture", type=Path, help="record the API traffic of the polls here"
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    summary = asyncio.run(async_main(args))
+    print(_report(summary))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
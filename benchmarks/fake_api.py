@@ -0,0 +1,322 @@
+"""Local stand-in for the petTracer cloud API.
+
+Serves the endpoints used by the integration for any number of synthetic
+collars. A share of the collars wanders around, the others stay put. Every
+call to ``advance`` moves the simulated clock on and lets each collar report
+a new fix, so backfills and movement statistics have something to work on.
+
+Latency and failures can be injected per request. The server runs on its own
+event loop in a background thread, so its CPU time does not show up in
+measurements taken on the Home Assistant loop.
+
+Run it standalone with ``python -m benchmarks.fake_api --collars 200``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+import math
+import random
+import threading
+from typing import Any
+from unittest.mock import patch
+import uuid
+
+from aiohttp import web
+
+# Fixes a collar keeps for getccpositions, a day at the default step
+POSITIONS_KEPT = 1440
+
+
+def _format_time(time: datetime) -> str:
+    """Format a time the way the petTracer API does."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S.") + f"{time.microsecond // 1000:03d}+0000"
+
+
+@dataclass
+class SimCollar:
+    """A synthetic collar."""
+
+    id: int
+    latitude: float
+    longitude: float
+    moving: bool
+    battery: int = 4100
+    positions: deque[dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=POSITIONS_KEPT)
+    )
+
+    def step(self, time: datetime, rng: random.Random) -> None:
+        """Report a new fix, after a random walk step if the collar moves.
+
+        The fix scatters around the true position by about its accuracy, the
+        way GPS fixes of a resting collar do.
+        """
+        if self.moving:
+            heading = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(20, 80)  # meters
+            self.latitude += distance * math.cos(heading) / 111_320
+            self.longitude += (
+                distance
+                * math.sin(heading)
+                / (111_320 * math.cos(math.radians(self.latitude)))
+            )
+        # Slow drain, about 1 mV per fix
+        self.battery = max(self.battery - rng.choice((0, 1, 1, 2)), 3300)
+        accuracy = rng.randint(4, 30)
+        error = rng.gauss(0, accuracy / 2)
+        heading = rng.uniform(0, 2 * math.pi)
+        self.positions.append(
+            {
+                "id": len(self.positions) + 1,
+                "posLat": round(self.latitude + error * math.cos(heading) / 111_320, 6),
+                "posLong": round(
+                    self.longitude
+                    + error
+                    * math.sin(heading)
+                    / (111_320 * math.cos(math.radians(self.latitude))),
+                    6,
+                ),
+                "acc": accuracy,
+                "sat": rng.randint(4, 12),
+                "rssi": rng.randint(-110, -60),
+                "timeMeasure": _format_time(time),
+                "timeDb": _format_time(time + timedelta(seconds=2)),
+                "flags": 0,
+            }
+        )
+
+    def as_json(self, time: datetime) -> dict[str, Any]:
+        """Return the collar as returned by getccs and getccinfo."""
+        return {
+            "id": self.id,
+            "bat": self.battery,
+            "chg": 0,
+            "mode": 1,
+            "modeSet": 1 if self.moving else 2,
+            "status": 0,
+            "search": False,
+            "lastContact": _format_time(time),
+            "lastPos": self.positions[-1] if self.positions else None,
+            "details": {"name": f"Collar {self.id}", "color": 1, "birth": None},
+            "home": not self.moving,
+            "owner": True,
+        }
+
+
+class FakePetTracerApi:
+    """aiohttp application serving synthetic collars."""
+
+    def __init__(
+        self,
+        collars: int = 100,
+        moving: float = 0.3,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 1,
+    ) -> None:
+        """Initialize the fake API."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.time = datetime.now(UTC).replace(microsecond=0)
+        self.requests: dict[str, int] = {}
+        self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._tokens: set[str] = set()
+        self.collars = [
+            SimCollar(
+                id=100_000 + number,
+                latitude=52.0 + self._rng.uniform(-0.5, 0.5),
+                longitude=4.5 + self._rng.uniform(-0.5, 0.5),
+                moving=number < collars * moving,
+            )
+            for number in range(collars)
+        ]
+        for collar in self.collars:
+            collar.step(self.time, self._rng)
+        self._by_id = {collar.id: collar for collar in self.collars}
+        self._runner: web.AppRunner | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self.url = ""
+
+    def advance(self, seconds: float = 60) -> None:
+        """Move the clock on and let every collar report a fix."""
+        self._call_soon(self._advance, seconds)
+
+    def expire_tokens(self) -> None:
+        """Invalidate all issued tokens, as if the sessions expired."""
+        self._call_soon(self._tokens.clear)
+
+    def _advance(self, seconds: float) -> None:
+        """Advance the simulation, on the server loop."""
+        self.time += timedelta(seconds=seconds)
+        for collar in self.collars:
+            collar.step(self.time, self._rng)
+
+    def _call_soon(self, func: Any, *args: Any) -> None:
+        """Run a function on the server loop and wait for it."""
+        if self._loop is None:
+            func(*args)
+            return
+        done = threading.Event()
+
+        def run() -> None:
+            func(*args)
+            done.set()
+
+        self._loop.call_soon_threadsafe(run)
+        done.wait()
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/api/user/login", self._login)
+        app.router.add_get("/api/map/getccs", self._getccs)
+        app.router.add_post("/api/map/getccinfo", self._getccinfo)
+        app.router.add_post("/api/map/getccpositions", self._getccpositions)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.Response:
+        """Count requests and inject latency, failures and auth checks."""
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._rng.uniform(0, self.jitter))
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise web.HTTPServiceUnavailable
+        if request.path != "/api/user/login":
+            token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if token not in self._tokens:
+                raise web.HTTPUnauthorized
+        response = await handler(request)
+        self.bytes_sent += response.content_length or 0
+        return response
+
+    async def _login(self, request: web.Request) -> web.Response:
+        """Issue a token for any credentials."""
+        body = await request.json()
+        token = uuid.uuid4().hex
+        self._tokens.add(token)
+        return web.json_response(
+            {
+                "id": 1,
+                "login": body.get("login"),
+                "name": "Benchmark",
+                "access_token": token,
+                "expires": (self.time + timedelta(days=30)).strftime("%Y-%m-%d"),
+                "numberOfCCs": len(self.collars),
+            }
+        )
+
+    async def _getccs(self, request: web.Request) -> web.Response:
+        """Return all collars."""
+        return web.json_response(
+            [collar.as_json(self.time) for collar in self.collars]
+        )
+
+    async def _getccinfo(self, request: web.Request) -> web.Response:
+        """Return a single collar."""
+        body = await request.json()
+        if (collar := self._by_id.get(body.get("devId"))) is None:
+            raise web.HTTPNotFound
+        return web.json_response(collar.as_json(self.time))
+
+    async def _getccpositions(self, request: web.Request) -> web.Response:
+        """Return the fixes of a collar within a time range."""
+        body = await request.json()
+        if (collar := self._by_id.get(body.get("devId"))) is None:
+            raise web.HTTPNotFound
+        start = datetime.fromtimestamp(body["filterTime"] / 1000, UTC)
+        end = datetime.fromtimestamp(body["toTime"] / 1000, UTC)
+        return web.json_response(
+            [
+                fix
+                for fix in collar.positions
+                if start
+                <= datetime.strptime(fix["timeMeasure"], "%Y-%m-%dT%H:%M:%S.%f%z")
+                <= end
+            ]
+        )
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve the API from a background thread, return its base URL."""
+        started = threading.Event()
+
+        async def serve() -> None:
+            self._runner = web.AppRunner(self.application(), access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, host, port)
+            await site.start()
+            bound = self._runner.addresses[0]
+            self.url = f"http://{bound[0]}:{bound[1]}"
+            started.set()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(serve())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-pettracer", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.url
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._loop is None or self._runner is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join()
+        self._loop = None
+
+
+@contextmanager
+def patch_client_urls(base_url: str):
+    """Point the petTracer client at a fake API."""
+    with (
+        patch("pettracer.client.LOGIN_URL", f"{base_url}/api/user/login"),
+        patch("pettracer.client.GETCCS_URL", f"{base_url}/api/map/getccs"),
+        patch("pettracer.client.CCINFO_URL", f"{base_url}/api/map/getccinfo"),
+        patch("pettracer.client.CCPOSITIONS_URL", f"{base_url}/api/map/getccpositions"),
+    ):
+        yield
+
+
+def main() -> None:
+    """Serve the fake API until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collars", type=int, default=100)
+    parser.add_argument("--moving", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--step", type=float, default=60, help="seconds per fix")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    api = FakePetTracerApi(
+        collars=args.collars,
+        moving=args.moving,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    print(f"Serving {args.collars} collars at {api.start(port=args.port)}")
+    try:
+        while True:
+            threading.Event().wait(args.step)
+            api.advance(args.step)
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
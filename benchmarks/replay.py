@@ -0,0 +1,353 @@
+"""Replay captured petTracer API traffic through the integration.
+
+Feeds the coordinator from a capture written by the ``pettracer.start_capture``
+action, or by ``bench_coordinator --capture``, instead of the petTracer cloud.
+Every captured getccs response becomes an account poll and every getccinfo
+response a refresh of that collar, in the order they were recorded. The clock
+of Home Assistant follows the capture, so a week of traffic runs through the
+integration in seconds, without any network.
+
+Run from the repository root::
+
+    python -m benchmarks.replay pettracer_captures/capture_20260101120000.jsonl.gz
+
+``--speed`` replays at a multiple of the recorded pace, 0 (the default) as
+fast as possible. ``--profile`` writes cProfile statistics of the replay.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from contextlib import ExitStack
+import cProfile
+from datetime import UTC, datetime
+from functools import partial
+import json
+import logging
+from pathlib import Path
+import pstats
+import sys
+import tempfile
+import time
+from typing import Any
+from unittest.mock import patch
+
+import aiohttp
+from pettracer import Device, LastPos, PetTracerError
+
+from homeassistant import loader
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, MATCH_ALL
+from homeassistant.core import Event, callback
+from homeassistant.helpers import frame
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.pettracer import device_tracker, sensor  # noqa: F401
+from custom_components.pettracer.capture import read_capture
+from custom_components.pettracer.const import CONF_LEAN_ATTRIBUTES, DOMAIN
+
+from .bench_coordinator import WriteCounter
+
+GETCCS_PATH = "/api/map/getccs"
+GETCCINFO_PATH = "/api/map/getccinfo"
+GETCCPOSITIONS_PATH = "/api/map/getccpositions"
+
+
+class Replay:
+    """The exchanges of a capture and the one currently being replayed."""
+
+    def __init__(self, exchanges: list[dict[str, Any]]) -> None:
+        """Index the captured fixes of each collar for backfills."""
+        self.exchanges = exchanges
+        self.current: dict[str, Any] | None = None
+        self.positions: dict[int, dict[str, dict[str, Any]]] = {}
+        for exchange in exchanges:
+            if exchange["status"] != 200 or not exchange["response"]:
+                continue
+            try:
+                data = json.loads(exchange["response"])
+            except ValueError:
+                continue
+            if exchange["path"] == GETCCPOSITIONS_PATH:
+                collar_id = _request(exchange).get("devId")
+                for fix in data if isinstance(data, list) else []:
+                    self._add_fix(collar_id, fix)
+            elif exchange["path"] in (GETCCS_PATH, GETCCINFO_PATH):
+                for item in data if isinstance(data, list) else [data]:
+                    if isinstance(item, dict) and item.get("lastPos"):
+                        self._add_fix(item.get("id"), item["lastPos"])
+
+    def _add_fix(self, collar_id: int | None, fix: dict[str, Any]) -> None:
+        """Remember a fix of a collar, once per measurement time."""
+        if collar_id is not None and isinstance(fix, dict) and fix.get("timeMeasure"):
+            self.positions.setdefault(collar_id, {})[fix["timeMeasure"]] = fix
+
+
+class ReplayClient:
+    """Stand-in for PetTracerClient that answers from a capture.
+
+    Responses are parsed the way the client parses them, so malformed data
+    fails the same way it did when it was captured.
+    """
+
+    def __init__(
+        self, replay: Replay, session: aiohttp.ClientSession | None = None
+    ) -> None:
+        """Initialize the client."""
+        self._replay = replay
+        self._session = session
+        self._token: str | None = None
+
+    @property
+    def token(self) -> str | None:
+        """Return the token."""
+        return self._token
+
+    @property
+    def session(self) -> aiohttp.ClientSession | None:
+        """Return the session, unused."""
+        return self._session
+
+    @property
+    def is_authenticated(self) -> bool:
+        """Return whether login was called."""
+        return self._token is not None
+
+    @property
+    def token_expires(self) -> datetime | None:
+        """Return when the token expires, never."""
+        return None
+
+    async def login(self, username: str, password: str, timeout: int = 10) -> None:
+        """Accept any credentials, logins are not captured."""
+        self._token = "replay"
+
+    async def get_all_devices(self, timeout: int = 10) -> list[Device]:
+        """Return the collars of the getccs response being replayed."""
+        data = _response(self._replay.current)
+        if not isinstance(data, list):
+            raise PetTracerError("Unexpected JSON structure: expected a list")
+        try:
+            return [Device.from_dict(item) for item in data]
+        except Exception as exc:
+            raise PetTracerError(f"Failed to parse device item: {exc}") from exc
+
+    def get_device(self, device_id: int) -> ReplayDevice:
+        """Return the device API of a collar."""
+        return ReplayDevice(self._replay, device_id)
+
+
+class ReplayDevice:
+    """Stand-in for the device API of the client."""
+
+    def __init__(self, replay: Replay, device_id: int) -> None:
+        """Initialize the device API."""
+        self._replay = replay
+        self._device_id = device_id
+
+    async def get_info(self, timeout: int = 10) -> Device | list[Device]:
+        """Return the getccinfo response being replayed."""
+        data = _response(self._replay.current)
+        if isinstance(data, dict):
+            return Device.from_dict(data)
+        if isinstance(data, list):
+            return [Device.from_dict(item) for item in data]
+        raise PetTracerError("Unexpected JSON structure from getccinfo")
+
+    async def get_positions(
+        self, filter_time: int, to_time: int, timeout: int = 10
+    ) -> list[LastPos]:
+        """Return every captured fix of the collar within a time range."""
+        positions = []
+        for fix in self._replay.positions.get(self._device_id, {}).values():
+            position = LastPos.from_dict(fix)
+            if (
+                position.timeMeasure is not None
+                and filter_time <= position.timeMeasure.timestamp() * 1000 <= to_time
+            ):
+                positions.append(position)
+        return positions
+
+
+def _request(exchange: dict[str, Any]) -> dict[str, Any]:
+    """Return the JSON body of a captured request."""
+    try:
+        body = json.loads(exchange["request"] or "{}")
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _response(exchange: dict[str, Any] | None) -> Any:
+    """Return the JSON body of a captured response, raise if it failed."""
+    if exchange is None:
+        raise PetTracerError("Nothing captured to replay")
+    if exchange["error"]:
+        raise PetTracerError(f"HTTP error: {exchange['error']}")
+    if exchange["status"] != 200:
+        raise PetTracerError(f"HTTP error: {exchange['status']}")
+    try:
+        return json.loads(exchange["response"] or "")
+    except ValueError as exc:
+        raise PetTracerError("Invalid JSON response") from exc
+
+
+async def run_replay(args: argparse.Namespace) -> dict[str, Any]:
+    """Replay a capture through the integration, return the measurements."""
+    exchanges = read_capture(args.capture)
+    steps = [
+        exchange
+        for exchange in exchanges
+        if exchange["path"] in (GETCCS_PATH, GETCCINFO_PATH)
+    ]
+    polls = [step for step in steps if step["path"] == GETCCS_PATH]
+    if not polls:
+        raise SystemExit(f"{args.capture} has no getccs responses to replay")
+    # The first poll sets the integration up
+    steps = steps[steps.index(polls[0]) :]
+    replay = Replay(exchanges)
+    clock = [datetime.fromtimestamp(steps[0]["time"], UTC)]
+    writes = WriteCounter()
+    events: Counter[str] = Counter()
+    results: dict[str, Any] = {
+        "exchanges": len(exchanges),
+        "polls": 0,
+        "collar_refreshes": 0,
+        "failures": 0,
+    }
+
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as config_dir:
+        stack.enter_context(
+            patch(
+                "custom_components.pettracer.PetTracerClient",
+                partial(ReplayClient, replay),
+            )
+        )
+        # Home Assistant and the integration see the time of the capture
+        stack.enter_context(
+            patch("homeassistant.util.dt.utcnow", lambda: clock[0])
+        )
+        # Requests cost nothing, the limits would only slow the replay down
+        stack.enter_context(
+            patch("custom_components.pettracer.scheduler.REQUEST_RATE", 1e9)
+        )
+        stack.enter_context(writes.patch())
+
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            frame.async_setup(hass)
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+
+            @callback
+            def count_event(event: Event) -> None:
+                if event.event_type.startswith(f"{DOMAIN}_"):
+                    events[event.event_type] += 1
+
+            hass.bus.async_listen(MATCH_ALL, count_event)
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={CONF_USERNAME: "replay@example.com", CONF_PASSWORD: "replay"},
+                options={CONF_LEAN_ATTRIBUTES: args.lean},
+                # Polls are driven by the capture
+                pref_disable_polling=True,
+            )
+            entry.add_to_hass(hass)
+            replay.current = steps[0]
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+
+            profiler = cProfile.Profile() if args.profile else None
+            if profiler:
+                profiler.enable()
+            started = time.perf_counter()
+            previous = steps[0]["time"]
+            for step in steps[1:]:
+                if args.speed:
+                    await asyncio.sleep(max(step["time"] - previous, 0) / args.speed)
+                previous = step["time"]
+                clock[0] = datetime.fromtimestamp(step["time"], UTC)
+                replay.current = step
+                if step["path"] == GETCCS_PATH:
+                    results["polls"] += 1
+                    await coordinator.async_refresh()
+                    if not coordinator.last_update_success:
+                        results["failures"] += 1
+                else:
+                    results["collar_refreshes"] += 1
+                    collar_id = _request(step).get("devId")
+                    try:
+                        await coordinator.async_refresh_collars([collar_id])
+                    except PetTracerError:
+                        results["failures"] += 1
+                await hass.async_block_till_done()
+            results["seconds"] = time.perf_counter() - started
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+
+            results["span"] = steps[-1]["time"] - steps[0]["time"]
+            results["collars"] = len(coordinator.data or {})
+            results["writes"] = writes.count
+            results["events"] = dict(events)
+            await hass.config_entries.async_unload(entry.entry_id)
+
+    return results
+
+
+def _report(results: dict[str, Any]) -> str:
+    """Format the results as text."""
+    span = results["span"]
+    seconds = results["seconds"]
+    lines = [
+        (
+            f"replayed {results['exchanges']} exchanges of {results['collars']} "
+            f"collars: {results['polls']} polls, {results['collar_refreshes']} "
+            f"collar refreshes, {results['failures']} failed"
+        ),
+        (
+            f"{span / 3600:.1f} h of traffic in {seconds:.2f} s "
+            f"({span / seconds if seconds else 0:.0f}x)"
+        ),
+        f"state writes: {results['writes']}",
+    ]
+    if results["events"]:
+        lines.append(
+            "events: "
+            + ", ".join(
+                f"{event} {count}" for event, count in sorted(results["events"].items())
+            )
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Parse the arguments and run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, help="capture file to replay")
+    parser.add_argument(
+        "--speed", type=float, default=0.0, help="multiple of the recorded pace"
+    )
+    parser.add_argument(
+        "--lean", action="store_true", help="enable lean tracker attributes"
+    )
+    parser.add_argument("--profile", type=Path, help="write cProfile stats here")
+    parser.add_argument("--json", type=Path, help="write the results here")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    results = asyncio.run(run_replay(args))
+    print(_report(results))
+    if args.profile:
+        pstats.Stats(str(args.profile)).sort_stats("cumulative").print_stats(15)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
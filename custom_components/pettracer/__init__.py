@@ -2,26 +2,90 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from functools import partial
 import logging
+from pathlib import Path
+import time
+from typing import Any
 
-import aiohttp
-
+from homeassistant.components.zone import ENTITY_ID_HOME, async_active_zone
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_time_change,
+    async_track_time_interval,
+)
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pettracer import PetTracerClient, PetTracerError
+from homeassistant.util import dt as dt_util
+from pettracer import Device, LastPos, PetTracerClient, PetTracerError
 
-from .const import DOMAIN, PLATFORMS
+from .const import (
+    CONF_ALIGN_POLLS,
+    CONF_BATTERY_THRESHOLD,
+    CONF_GEOFENCE_FILE,
+    CONF_HISTORY_MAX_AGE,
+    CONF_HISTORY_SIZE,
+    CONF_MAX_ACCURACY,
+    CONF_MOVEMENT_RESET,
+    CONF_POSITION_FILTER,
+    CONF_SILENT_AFTER,
+    CONF_STALE_GRACE,
+    DATA_COLLARS,
+    DATA_SCHEDULER,
+    DEFAULT_ALIGN_POLLS,
+    DEFAULT_BATTERY_THRESHOLD,
+    DEFAULT_GEOFENCE_FILE,
+    DEFAULT_HISTORY_MAX_AGE,
+    DEFAULT_HISTORY_SIZE,
+    DEFAULT_MAX_ACCURACY,
+    DEFAULT_MOVEMENT_RESET,
+    DEFAULT_POSITION_FILTER,
+    DEFAULT_SILENT_AFTER,
+    DEFAULT_STALE_GRACE,
+    DOMAIN,
+    EVENT_ZONE_ENTERED,
+    EVENT_ZONE_LEFT,
+    MOVEMENT_RESET_DAILY,
+    MOVEMENT_RESET_MONTHLY,
+    MOVEMENT_RESET_WEEKLY,
+    PLATFORMS,
+    POLL_INTERVAL_LIVE,
+    POLL_INTERVAL_NORMAL,
+    STALE_DEVICE_REFRESHES,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .api import PetTracerApi
+from .battery import DrainEstimator, battery_percentage
+from .filter import PositionFilter
+from .geofence import GeofenceIndex, load_geofences
+from .history import PositionHistory
+from .metrics import PetTracerMetrics
+from .model import CollarView, build_view
+from .movement import MovementTracker
+from .places import PlaceTracker
+from .polling import AdaptivePolling
+from .scheduler import PollScheduler
+from .services import async_setup_services
+from .storage import device_to_json, devices_from_json
+from .transitions import TransitionEngine
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the petTracer component."""
+    async_setup_services(hass)
     return True
 
 
@@ -29,56 +93,120 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up petTracer from a config entry."""
     _LOGGER.debug("async_setup_entry called for entry: %s", entry.entry_id)
     username = entry.data[CONF_USERNAME]
-    password = entry.data[CONF_PASSWORD]
-
-    # Create our own aiohttp session for petTracer
-    # HA's managed session has incompatible settings for the petTracer API
-    _LOGGER.debug("Creating dedicated session for petTracer API")
-    session = aiohttp.ClientSession()
-    client = PetTracerClient(session=session)
-
-    # Authenticate and validate
-    try:
-        _LOGGER.debug("Logging in with username: %s", username)
-        await client.login(username, password, timeout=10)
-        # Test authentication by fetching devices
-        await client.get_all_devices()
-        _LOGGER.debug("Authentication successful")
-    except PetTracerError as err:
-        _LOGGER.error("Failed to authenticate with petTracer: %s", err)
-        await session.close()
-        raise ConfigEntryAuthFailed from err
-    except Exception as err:
-        _LOGGER.error("Unexpected error connecting to petTracer: %s", err)
-        await session.close()
-        raise ConfigEntryNotReady from err
-
-    coordinator = PetTracerDataUpdateCoordinator(hass, client, entry, session)
-    _LOGGER.debug("Coordinator created, performing first refresh")
-    await coordinator.async_config_entry_first_refresh()
-    _LOGGER.debug("First refresh complete")
+
+    # All accounts share one session and take turns polling
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        _LOGGER.debug("Creating shared session for petTracer API")
+        scheduler = hass.data[DATA_SCHEDULER] = PollScheduler()
+    scheduler.register(entry.entry_id)
+    client = PetTracerClient(session=scheduler.session)
+    coordinator = PetTracerDataUpdateCoordinator(hass, client, entry, scheduler)
+    await coordinator.async_load_geofences()
+
+    if await coordinator.async_restore():
+        # Entities are created from the last known state straight away, login
+        # and refresh happen in the background
+        _LOGGER.debug("Restored snapshot, refreshing in the background")
+    else:
+        # Nothing stored yet, authenticate and fetch before creating entities
+        try:
+            _LOGGER.debug("Logging in with username: %s", username)
+            await coordinator.api.login()
+            _LOGGER.debug("Authentication successful")
+        except PetTracerError as err:
+            _LOGGER.error("Failed to authenticate with petTracer: %s", err)
+            await _async_release_scheduler(hass, entry.entry_id)
+            raise ConfigEntryAuthFailed from err
+        except Exception as err:
+            _LOGGER.error("Unexpected error connecting to petTracer: %s", err)
+            await _async_release_scheduler(hass, entry.entry_id)
+            raise ConfigEntryNotReady from err
+
+        _LOGGER.debug("Coordinator created, performing first refresh")
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await _async_release_scheduler(hass, entry.entry_id)
+            raise
+        _LOGGER.debug("First refresh complete")
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
     _LOGGER.debug("Coordinator stored in hass.data")
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    # Every reset period ends at local midnight
+    entry.async_on_unload(
+        async_track_time_change(
+            hass, coordinator.async_reset_movement, hour=0, minute=0, second=0
+        )
+    )
+
+    if coordinator.restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_refresh_{entry.entry_id}"
+        )
     _LOGGER.debug("Entry setup complete")
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
-        # Close the session we created
-        if hasattr(coordinator, "session"):
-            await coordinator.session.close()
+        coordinator: PetTracerDataUpdateCoordinator = hass.data[DOMAIN].pop(
+            entry.entry_id
+        )
+        # A reload restores from the snapshot, it has to be the current one
+        await coordinator.async_save()
+        # Shared collars go to the other accounts on their next refresh
+        claims = hass.data.get(DATA_COLLARS, {})
+        for device_id in [
+            device_id
+            for device_id, (entry_id, _) in claims.items()
+            if entry_id == entry.entry_id
+        ]:
+            del claims[device_id]
+        await _async_release_scheduler(hass, entry.entry_id)
 
     return unload_ok
 
 
+async def _async_release_scheduler(hass: HomeAssistant, entry_id: str) -> None:
+    """Give up the polling slot of an entry, close the session after the last."""
+    scheduler: PollScheduler = hass.data[DATA_SCHEDULER]
+    scheduler.unregister(entry_id)
+    if not scheduler:
+        del hass.data[DATA_SCHEDULER]
+        await scheduler.async_close()
+
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: dr.DeviceEntry
+) -> bool:
+    """Allow removing the device of a collar that left the account."""
+    coordinator: PetTracerDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return not any(
+        domain == DOMAIN
+        and (
+            str(identifier) == entry.entry_id
+            or str(identifier) in {str(device_id) for device_id in coordinator.data}
+        )
+        for domain, identifier in device_entry.identifiers
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored snapshot when a config entry is removed."""
+    await Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}").async_remove()
+
+
 class PetTracerDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching petTracer data."""
 
@@ -87,37 +215,878 @@ class PetTracerDataUpdateCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         client: PetTracerClient,
         entry: ConfigEntry,
-        session: aiohttp.ClientSession,
+        scheduler: PollScheduler,
     ) -> None:
         """Initialize the coordinator."""
         self.client = client
         self.entry = entry
-        self.session = session
+        self.scheduler = scheduler
+        # Request, refresh and state write counters, shown in diagnostics
+        self.metrics = PetTracerMetrics()
+        self.api = PetTracerApi(
+            client,
+            scheduler,
+            self.metrics,
+            entry.data[CONF_USERNAME],
+            entry.data[CONF_PASSWORD],
+        )
+        # What the entities of each collar show, rebuilt once per refresh.
+        # Each entity compares its part with what it wrote before.
+        self.views: dict[str, CollarView] = {}
+        self.polling = AdaptivePolling()
+        self.store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}"
+        )
+        # Loop time the pending snapshot is written at, however many refreshes
+        # come before it
+        self._save_due: float | None = None
+        # Recent fixes of each collar, the API only reports the latest one
+        self.history: dict[str, PositionHistory] = {}
+        # Jitter filtered position per collar, shown by the device trackers
+        self.filters: dict[str, PositionFilter] = {}
+        # Distance, speed and time away per collar, updated once per new fix
+        self.movement: dict[str, MovementTracker] = {}
+        # Decaying dwell time per grid cell of each collar
+        self.places: dict[str, PlaceTracker] = {}
+        # Battery drain fit per collar, paused while charging
+        self.battery: dict[str, DrainEstimator] = {}
+        # Custom polygon zones and the ones each collar is currently in
+        self.geofences = GeofenceIndex([])
+        self.geofence_zones: dict[str, list[str]] = {}
+        # Charging, battery, search, tracking mode and contact state of each
+        # collar at the last refresh, changes are fired as events
+        self.transitions = TransitionEngine()
+        # Time of the newest fix seen per collar, fixes after it are fetched
+        # when recovering from failed refreshes or a restart
+        self._cursors: dict[str, datetime] = {}
+        self._backfill_pending = False
+        self._backfill_failed: set[str] = set()
+        # Collars seen in the last refresh, to notice the account changing
+        self._known_device_ids: set[str] | None = None
+        # Refreshes in a row the device of each collar was missing from
+        self._missing_devices: dict[str, int] = {}
+        # Collars another account took over, their entities are gone
+        self._released_collars: set[Any] = set()
+        # Whether the current data came from the stored snapshot
+        self.restored = False
+        # End of the live tracking of collars, and the callbacks that stop
+        # their own polls
+        self.live_tracking: dict[str, datetime] = {}
+        self._live_tracking_unsubs: dict[str, list[CALLBACK_TYPE]] = {}
+        self._collar_polls: set[str] = set()
+        # Marks the last good data stale once the grace window is over
+        self._unsub_stale: CALLBACK_TYPE | None = None
 
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=entry,
             name=DOMAIN,
-            update_interval=timedelta(minutes=1),
+            update_interval=POLL_INTERVAL_NORMAL,
+        )
+
+    async def async_load_geofences(self) -> None:
+        """Load the polygon zones from the configured GeoJSON file."""
+        path = Path(
+            self.hass.config.path(
+                self.entry.options.get(CONF_GEOFENCE_FILE, DEFAULT_GEOFENCE_FILE)
+            )
         )
+        try:
+            geofences = await self.hass.async_add_executor_job(load_geofences, path)
+        except (OSError, TypeError, ValueError) as err:
+            _LOGGER.error("Failed to load geofences from %s: %s", path, err)
+            return
+
+        self.geofences = GeofenceIndex(geofences)
+        _LOGGER.debug("Loaded %d geofences from %s", len(geofences), path)
+
+    async def async_restore(self) -> bool:
+        """Load the last snapshot from storage, return whether one was found."""
+        if not (snapshot := await self.store.async_load()):
+            return False
+        if not (data := devices_from_json(snapshot.get("devices", []))):
+            return False
+        data = self._async_claim_collars(data)
+
+        if updated := snapshot.get("updated"):
+            self.metrics.last_success = dt_util.parse_datetime(updated)
+
+        _LOGGER.debug("Restored %d collars from storage", len(data))
+        self.restored = True
+        self._async_record_positions(data)
+        self._async_update_geofences(data)
+        for device_id, cursor in snapshot.get("cursors", []):
+            if device_id in data and (measured := dt_util.parse_datetime(cursor)):
+                self._cursors[device_id] = measured
+        for device_id, movement in snapshot.get("movement", []):
+            if device_id in data:
+                self.movement[device_id] = MovementTracker.from_dict(movement)
+        for device_id, places in snapshot.get("places", []):
+            if device_id in data:
+                self.places[device_id] = PlaceTracker.from_dict(places)
+        for device_id, battery in snapshot.get("battery", []):
+            if device_id in data:
+                self.battery[device_id] = DrainEstimator.from_dict(battery)
+        # Fetch whatever the collars reported while HA was not running
+        self._backfill_pending = True
+        self._async_adapt_interval(data)
+        self._async_update_views(data)
+        self._async_fire_transitions(data.keys())
+        self.data = data
+        return True
 
     async def _async_update_data(self):
+        """Fetch data from petTracer API and time the refresh."""
+        self.metrics.refresh_started()
+        started = time.perf_counter()
+        try:
+            data = await self._async_fetch_data()
+        except UpdateFailed:
+            self.metrics.refresh_finished(time.perf_counter() - started, False)
+            self._async_schedule_stale()
+            raise
+        self.metrics.refresh_finished(time.perf_counter() - started, True)
+        if self._unsub_stale:
+            self._unsub_stale()
+            self._unsub_stale = None
+        return data
+
+    @property
+    def collar_ids(self) -> set[Any]:
+        """Return the collars that have entities.
+
+        Those of the last refresh, and the ones that went missing from it but
+        keep their device for a few more refreshes.
+        """
+        linked = {
+            identifier
+            for device in dr.async_entries_for_config_entry(
+                dr.async_get(self.hass), self.entry.entry_id
+            )
+            for domain, identifier in device.identifiers
+            if domain == DOMAIN and identifier != self.entry.entry_id
+        }
+        return (self.views.keys() | linked) - self._released_collars
+
+    @property
+    def stale_grace(self) -> timedelta:
+        """Return how long the last good data is shown while updates fail."""
+        return timedelta(
+            minutes=self.entry.options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE)
+        )
+
+    @property
+    def data_available(self) -> bool:
+        """Return whether the data is recent enough to be shown."""
+        if self.last_update_success:
+            return True
+        last_success = self.metrics.last_success
+        return (
+            last_success is not None
+            and dt_util.utcnow() - last_success < self.stale_grace
+        )
+
+    @callback
+    def _async_schedule_stale(self) -> None:
+        """Make the entities unavailable once the grace window runs out."""
+        if self._unsub_stale or (last_success := self.metrics.last_success) is None:
+            return
+        delay = (last_success + self.stale_grace - dt_util.utcnow()).total_seconds()
+        if delay <= 0:
+            return
+        _LOGGER.debug("Update failed, showing the last data for %.0f s", delay)
+        self._unsub_stale = async_call_later(self.hass, delay, self._async_stale)
+
+    @callback
+    def _async_stale(self, _now: datetime) -> None:
+        """Let the entities notice the data went stale."""
+        self._unsub_stale = None
+        _LOGGER.info("No successful update for %s, data is stale", self.stale_grace)
+        self.async_update_listeners()
+
+    async def _async_fetch_data(self) -> dict[str, Device]:
         """Fetch data from petTracer API."""
+        if not self.last_update_success:
+            # Positions reported during the outage were not seen
+            self._backfill_pending = True
+
         try:
             # Get all devices using the async get_all_devices() method
-            # Returns List[Device] with Device dataclass objects
-            devices = await self.client.get_all_devices()
+            # Returns List[Device] with Device dataclass objects. A missing
+            # or expired session is renewed by the request layer.
+            devices = await self.api.get_all_devices()
         except PetTracerError as err:
             raise UpdateFailed(
                 f"Error communicating with petTracer API: {err}"
             ) from err
+
+        # Build a dictionary with device data, keyed by device ID
+        data = {}
+        for device in devices:
+            if device.id:
+                # Store the complete Device object
+                # lastPos contains the latest location data
+                data[device.id] = device
+        data = self._async_claim_collars(data)
+
+        self.restored = False
+        if devices and (
+            data.keys() != self._known_device_ids or self._missing_devices
+        ):
+            # An empty response is more likely a hiccup than an empty account
+            self._async_remove_stale_devices(data)
+            self._known_device_ids = set(data)
+        if self._backfill_pending:
+            self._backfill_failed = await self._async_backfill(data)
+            self._backfill_pending = bool(self._backfill_failed)
+        self._async_process(data)
+        return data
+
+    @callback
+    def _async_process(
+        self, data: dict[str, Device], device_ids: set[str] | None = None
+    ) -> None:
+        """Derive everything the entities show from freshly fetched data.
+
+        With ``device_ids`` only those collars were fetched, the poll interval
+        of the account stays and only their views are rebuilt.
+        """
+        self._async_record_positions(data)
+        self._async_update_geofences(data)
+        self._async_update_battery(data)
+        if device_ids is None:
+            self._async_adapt_interval(data)
+        self._async_update_views(data, device_ids)
+        self._async_fire_transitions(data.keys() if device_ids is None else device_ids)
+        if device_ids is None:
+            self.transitions.retain(data)
+        self._async_schedule_save(data)
+
+    @callback
+    def async_start_live_tracking(
+        self, device_id: str, duration: timedelta
+    ) -> datetime:
+        """Poll a single collar on its own for a while, return until when."""
+        self.async_stop_live_tracking(device_id)
+        until = dt_util.utcnow() + duration
+        self.live_tracking[device_id] = until
+        self._live_tracking_unsubs[device_id] = [
+            async_track_time_interval(
+                self.hass,
+                partial(self._async_poll_collar, device_id),
+                POLL_INTERVAL_LIVE,
+                name=f"{DOMAIN} live tracking {device_id}",
+                cancel_on_shutdown=True,
+            ),
+            async_call_later(
+                self.hass, duration, partial(self._async_live_tracking_ended, device_id)
+            ),
+        ]
+        _LOGGER.info("Live tracking collar %s until %s", device_id, until)
+        self.entry.async_create_background_task(
+            self.hass,
+            self._async_poll_collar(device_id),
+            f"{DOMAIN}_live_tracking_{device_id}",
+        )
+        return until
+
+    @callback
+    def async_stop_live_tracking(self, device_id: str) -> None:
+        """Stop polling a collar on its own."""
+        for unsub in self._live_tracking_unsubs.pop(device_id, []):
+            unsub()
+        if self.live_tracking.pop(device_id, None) is not None:
+            _LOGGER.info("Stopped live tracking collar %s", device_id)
+
+    @callback
+    def _async_live_tracking_ended(self, device_id: str, _now: datetime) -> None:
+        """Go back to the account poll once the live tracking window is over."""
+        self.async_stop_live_tracking(device_id)
+
+    async def _async_poll_collar(
+        self, device_id: str, _now: datetime | None = None
+    ) -> None:
+        """Poll a collar in live tracking."""
+        if self.data and device_id not in self.data:
+            # Left the account in the meantime
+            self.async_stop_live_tracking(device_id)
+            return
+        try:
+            await self.async_refresh_collars([device_id])
+        except PetTracerError as err:
+            _LOGGER.debug("Failed to poll collar %s: %s", device_id, err)
+
+    async def async_refresh_collars(self, device_ids: Iterable[str]) -> None:
+        """Fetch some collars on their own and update only their entities.
+
+        Costs a small getccinfo request per collar instead of fetching the
+        whole account. The account poll keeps its interval and time slot.
+        Collars that were fetched are merged even if others failed, the
+        first error is raised afterwards.
+        """
+        if not self.data:
+            # Nothing to merge into before the first full refresh
+            return
+        # Collars already being fetched are left to that request
+        wanted = [
+            device_id
+            for device_id in dict.fromkeys(device_ids)
+            if device_id in self.data and device_id not in self._collar_polls
+        ]
+        if not wanted:
+            return
+        self._collar_polls.update(wanted)
+        try:
+            results = await asyncio.gather(
+                *(self.api.get_device(device_id) for device_id in wanted),
+                return_exceptions=True,
+            )
+        finally:
+            self._collar_polls.difference_update(wanted)
+
+        fetched: dict[str, Device] = {}
+        error: PetTracerError | None = None
+        for device_id, result in zip(wanted, results, strict=True):
+            if isinstance(result, PetTracerError):
+                error = error or result
+            elif isinstance(result, BaseException):
+                raise result
+            elif device_id in self.data:
+                fetched[device_id] = result
+
+        if fetched and self._backfill_pending:
+            # Recording the fetched fixes moves the cursors past the ones
+            # missed before them, those have to be fetched first
+            failed = await self._async_backfill(fetched)
+            self._backfill_failed = (self._backfill_failed - fetched.keys()) | failed
+        if fetched:
+            data = {**self.data, **fetched}
+            self._async_process(data, set(fetched))
+            self.data = data
+            self._async_update_collar_listeners(fetched.keys())
+        if error:
+            raise error
+
+    @callback
+    def _async_update_collar_listeners(self, device_ids: Iterable[str]) -> None:
+        """Update the listeners of some collars, the entities of the others."""
+        device_ids = set(device_ids)
+        for update_callback, context in list(self._listeners.values()):
+            if context in device_ids:
+                update_callback()
+
+    async def async_shutdown(self) -> None:
+        """Stop live tracking along with the refreshes."""
+        for device_id in list(self.live_tracking):
+            self.async_stop_live_tracking(device_id)
+        if self._unsub_stale:
+            self._unsub_stale()
+            self._unsub_stale = None
+        await super().async_shutdown()
+
+    async def _async_backfill(self, data: dict[str, Device]) -> set[str]:
+        """Fetch the fixes each collar reported while we were not polling.
+
+        Only the gap between the newest fix we have seen and the one just
+        received is requested, so recovering from an outage never downloads
+        positions we already have. Return the collars that failed.
+        """
+        failed: set[str] = set()
+        for device_id, device in data.items():
+            cursor = self._cursors.get(device_id)
+            pos = device.lastPos
+            if (
+                cursor is None
+                or not pos
+                or pos.timeMeasure is None
+                or pos.timeMeasure <= cursor
+            ):
+                continue
+
+            try:
+                positions = await self.api.get_positions(
+                    device_id,
+                    int(cursor.timestamp() * 1000) + 1,
+                    int(pos.timeMeasure.timestamp() * 1000),
+                )
+            except PetTracerError as err:
+                _LOGGER.warning(
+                    "Failed to fetch missed positions for collar %s: %s",
+                    device_id,
+                    err,
+                )
+                failed.add(device_id)
+                continue
+
+            # The API may return fixes at the edges of the range again
+            fixes = {
+                fix.timeMeasure: fix
+                for fix in positions
+                if fix.timeMeasure is not None
+                and fix.timeMeasure > cursor
+                and fix.posLat is not None
+                and fix.posLong is not None
+            }
+            for fix_time in sorted(fixes):
+                self._async_add_fix(device_id, fixes[fix_time])
+            if fixes and (newest := max(fixes)) > pos.timeMeasure:
+                device.lastPos = fixes[newest]
+            _LOGGER.debug(
+                "Backfilled %d missed fixes for collar %s", len(fixes), device_id
+            )
+
+        # Collars that failed keep their cursor and are retried next refresh
+        return failed
+
+    @callback
+    def _async_claim_collars(self, data: dict[str, Device]) -> dict[str, Device]:
+        """Return the collars of the account no other account tracks.
+
+        A collar shared with another account is tracked by the one that owns
+        it. If neither owns it, the account that saw it first keeps it.
+        """
+        claims: dict[str, tuple[str, bool]] = self.hass.data.setdefault(
+            DATA_COLLARS, {}
+        )
+        entry_id = self.entry.entry_id
+        tracked: dict[str, Device] = {}
+        for device_id, device in data.items():
+            owner = bool(device.owner)
+            if (claim := claims.get(device_id)) and claim[0] != entry_id:
+                if not owner or claim[1]:
+                    continue
+                if other := self.hass.data.get(DOMAIN, {}).get(claim[0]):
+                    other.async_release_collar(device_id)
+            claims[device_id] = (entry_id, owner)
+            tracked[device_id] = device
+            self._released_collars.discard(device_id)
+        # Collars that left the account are free for the others again
+        for device_id in [
+            device_id
+            for device_id, (claimed_by, _) in claims.items()
+            if claimed_by == entry_id and device_id not in data
+        ]:
+            del claims[device_id]
+        return tracked
+
+    @callback
+    def async_release_collar(self, device_id: str) -> None:
+        """Remove the entities of a collar the owning account took over.
+
+        The collar is left out from the next refresh on, which also detaches
+        its device from this entry once the others would have been.
+        """
+        _LOGGER.info(
+            "Collar %s is tracked by the account that owns it from now on", device_id
+        )
+        self.async_stop_live_tracking(device_id)
+        self._released_collars.add(device_id)
+        if self.data and device_id in self.data:
+            self.data = {
+                collar_id: device
+                for collar_id, device in self.data.items()
+                if collar_id != device_id
+            }
+        self.views.pop(device_id, None)
+        entity_registry = er.async_get(self.hass)
+        prefix = f"{DOMAIN}_{device_id}"
+        for entity in er.async_entries_for_config_entry(
+            entity_registry, self.entry.entry_id
+        ):
+            if entity.unique_id == prefix or entity.unique_id.startswith(
+                f"{prefix}_"
+            ):
+                entity_registry.async_remove(entity.entity_id)
+
+    @callback
+    def _async_remove_stale_devices(self, data: dict[str, Device]) -> None:
+        """Remove the devices of collars that are no longer part of the account.
+
+        A device goes once its collar was missing from STALE_DEVICE_REFRESHES
+        refreshes in a row. Its entities go with it, the platforms add
+        entities for new collars themselves.
+        """
+        current = {str(device_id) for device_id in data} | {self.entry.entry_id}
+        device_registry = dr.async_get(self.hass)
+        missing: dict[str, int] = {}
+        for device in dr.async_entries_for_config_entry(
+            device_registry, self.entry.entry_id
+        ):
+            if any(
+                domain == DOMAIN and str(identifier) in current
+                for domain, identifier in device.identifiers
+            ):
+                continue
+            count = self._missing_devices.get(device.id, 0) + 1
+            if count < STALE_DEVICE_REFRESHES:
+                missing[device.id] = count
+                continue
+            _LOGGER.info(
+                "Removing %s, it is no longer part of the account", device.name
+            )
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=self.entry.entry_id
+            )
+        self._missing_devices = missing
+
+    @callback
+    def _async_record_positions(self, data: dict[str, Device]) -> None:
+        """Add the latest fix of each collar to its position history."""
+        now = dt_util.utcnow().timestamp()
+        for device_id, device in data.items():
+            pos = device.lastPos
+            if (
+                not pos
+                or pos.timeMeasure is None
+                or pos.posLat is None
+                or pos.posLong is None
+            ):
+                continue
+            self._async_add_fix(device_id, pos)
+            self.history[device_id].evict(now)
+            if device_id not in self._backfill_failed:
+                self._cursors[device_id] = pos.timeMeasure
+
+        # Forget collars that are no longer part of the account
+        for device_id in self.history.keys() - data.keys():
+            del self.history[device_id]
+        for device_id in self._cursors.keys() - data.keys():
+            del self._cursors[device_id]
+        for device_id in self.movement.keys() - data.keys():
+            del self.movement[device_id]
+        for device_id in self.places.keys() - data.keys():
+            del self.places[device_id]
+        for device_id in self.filters.keys() - data.keys():
+            del self.filters[device_id]
+
+    @callback
+    def _async_add_fix(self, device_id: str, pos: LastPos) -> None:
+        """Append a fix to the position history of a collar."""
+        if (history := self.history.get(device_id)) is None:
+            history = self.history[device_id] = PositionHistory(
+                self.entry.options.get(CONF_HISTORY_SIZE, DEFAULT_HISTORY_SIZE),
+                self.entry.options.get(CONF_HISTORY_MAX_AGE, DEFAULT_HISTORY_MAX_AGE)
+                * 3600,
+            )
+        history.append(
+            pos.timeMeasure.timestamp(),
+            pos.posLat,
+            pos.posLong,
+            pos.acc,
+            pos.sat,
+            pos.rssi,
+        )
+        if self.entry.options.get(CONF_POSITION_FILTER, DEFAULT_POSITION_FILTER):
+            if (position := self.filters.get(device_id)) is None:
+                position = self.filters[device_id] = PositionFilter()
+            if not position.update(
+                pos.timeMeasure.timestamp(),
+                pos.posLat,
+                pos.posLong,
+                pos.acc or 0,
+                pos.sat,
+                pos.rssi,
+            ):
+                _LOGGER.debug(
+                    "Ignoring fix of collar %s at %s, implausible jump",
+                    device_id,
+                    pos.timeMeasure,
+                )
+        self._async_add_movement(device_id, pos)
+        self._async_add_place(device_id, pos)
+
+    @callback
+    def _async_update_geofences(self, data: dict[str, Device]) -> None:
+        """Work out which geofences each collar is in and fire events."""
+        if not self.geofences:
+            return
+
+        for device_id, device in data.items():
+            pos = device.lastPos
+            if not pos or pos.posLat is None or pos.posLong is None:
+                continue
+            zones = [
+                fence.name for fence in self.geofences.lookup(pos.posLat, pos.posLong)
+            ]
+            previous = self.geofence_zones.get(device_id)
+            self.geofence_zones[device_id] = zones
+            if previous is None or previous == zones:
+                # Nothing to compare against after a restart
+                continue
+
+            event_data = {
+                "collar_id": device_id,
+                "name": device.details.name if device.details else None,
+            }
+            for zone in previous:
+                if zone not in zones:
+                    self.hass.bus.async_fire(
+                        EVENT_ZONE_LEFT, {**event_data, "zone": zone}
+                    )
+            for zone in zones:
+                if zone not in previous:
+                    self.hass.bus.async_fire(
+                        EVENT_ZONE_ENTERED, {**event_data, "zone": zone}
+                    )
+
+        for device_id in self.geofence_zones.keys() - data.keys():
+            del self.geofence_zones[device_id]
+
+    @callback
+    def _async_update_battery(self, data: dict[str, Device]) -> None:
+        """Feed the battery level of each collar into its drain estimate."""
+        now = dt_util.utcnow()
+        for device_id, device in data.items():
+            if not device.bat:
+                continue
+            if (battery := self.battery.get(device_id)) is None:
+                battery = self.battery[device_id] = DrainEstimator()
+            if device.chg == 1:
+                # Charging, the drain is measured again once unplugged
+                battery.reset()
+                continue
+            # The level was measured when the collar last reported
+            measured = (
+                device.lastContact
+                if isinstance(device.lastContact, datetime)
+                else now
+            )
+            battery.add(measured.timestamp(), battery_percentage(device.bat))
+
+        for device_id in self.battery.keys() - data.keys():
+            del self.battery[device_id]
+
+    @callback
+    def _async_add_movement(self, device_id: str, pos: LastPos) -> None:
+        """Fold a fix into the movement statistics of a collar."""
+        accuracy = pos.acc or 0
+        if accuracy > self.entry.options.get(CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY):
+            # Too inaccurate, counting it would only add GPS jitter
+            return
+
+        period = self._movement_period(pos.timeMeasure)
+        if (movement := self.movement.get(device_id)) is None:
+            movement = self.movement[device_id] = MovementTracker(period)
+        away = None
+        if self.hass.states.get(ENTITY_ID_HOME) is not None:
+            # Unknown until the home zone is set up during startup
+            zone = async_active_zone(self.hass, pos.posLat, pos.posLong, accuracy)
+            away = zone is None or zone.entity_id != ENTITY_ID_HOME
+        movement.add_fix(
+            pos.timeMeasure.timestamp(),
+            pos.posLat,
+            pos.posLong,
+            accuracy,
+            away,
+            period,
+        )
+
+    @callback
+    def _async_add_place(self, device_id: str, pos: LastPos) -> None:
+        """Count the time spent at the previous fix of a collar."""
+        if (pos.acc or 0) > self.entry.options.get(
+            CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY
+        ):
+            return
+        if (places := self.places.get(device_id)) is None:
+            places = self.places[device_id] = PlaceTracker()
+        places.add_fix(pos.timeMeasure.timestamp(), pos.posLat, pos.posLong)
+
+    @callback
+    def async_reset_movement(self, _now: datetime | None = None) -> None:
+        """Show the statistics of a new reset period once it started.
+
+        A charging or silent collar reports no fix to start the period with.
+        """
+        if not self.data or not self._async_start_movement_period():
+            return
+        self._async_update_views(self.data)
+        self.async_update_listeners()
+        data = self.data
+        self._async_schedule_save(data)
+
+    @callback
+    def _async_start_movement_period(self) -> bool:
+        """Reset the statistics of the past period, return whether any were."""
+        period = self._movement_period(dt_util.utcnow())
+        started = False
+        for movement in self.movement.values():
+            if movement.period != period:
+                movement.reset(period)
+                started = True
+        return started
+
+    def _movement_period(self, time: datetime) -> str:
+        """Return the reset period a fix belongs to."""
+        local = dt_util.as_local(time)
+        reset = self.entry.options.get(CONF_MOVEMENT_RESET, DEFAULT_MOVEMENT_RESET)
+        if reset == MOVEMENT_RESET_DAILY:
+            return local.date().isoformat()
+        if reset == MOVEMENT_RESET_WEEKLY:
+            year, week, _ = local.isocalendar()
+            return f"{year}-W{week:02d}"
+        if reset == MOVEMENT_RESET_MONTHLY:
+            return f"{local.year}-{local.month:02d}"
+        return ""
+
+    @callback
+    def _async_schedule_save(self, data: dict[str, Device]) -> None:
+        """Save the snapshot STORAGE_SAVE_DELAY after the first unsaved change.
+
+        Store debounces every delayed save, so with polls more frequent than
+        the delay the snapshot would only be written on shutdown. Later
+        changes go into the pending save instead of postponing it.
+        """
+        now = self.hass.loop.time()
+        if self._save_due is None or now >= self._save_due:
+            self._save_due = now + STORAGE_SAVE_DELAY
+        self.store.async_delay_save(
+            lambda: self._async_snapshot(data), self._save_due - now
+        )
+
+    async def async_save(self) -> None:
+        """Write the snapshot right away, before the entry is unloaded."""
+        if not self.data:
+            return
+        self._save_due = None
+        await self.store.async_save(self._async_snapshot(self.data))
+
+    @callback
+    def _async_snapshot(self, data: dict[str, Device]) -> dict[str, Any]:
+        """Return the state that is persisted between restarts."""
+        return {
+            "updated": self.metrics.last_success.isoformat()
+            if self.metrics.last_success
+            else None,
+            "devices": [device_to_json(device) for device in data.values()],
+            "cursors": [
+                [device_id, cursor.isoformat()]
+                for device_id, cursor in self._cursors.items()
+            ],
+            "movement": [
+                [device_id, movement.as_dict()]
+                for device_id, movement in self.movement.items()
+            ],
+            "battery": [
+                [device_id, battery.as_dict()]
+                for device_id, battery in self.battery.items()
+            ],
+            "places": [
+                [device_id, places.as_dict()]
+                for device_id, places in self.places.items()
+            ],
+        }
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll in the time slot of this account."""
+        if self.update_interval is None or self.entry.pref_disable_polling:
+            return
+
+        self._async_unsub_refresh()
+        interval = self.update_interval.total_seconds()
+        if not self.last_update_success and (
+            (retry_delay := self.api.retry_delay) is not None
+        ):
+            # Back off while the API is failing
+            _LOGGER.debug("Last request failed, retrying in %.0f s", retry_delay)
+            interval = retry_delay
+        loop = self.hass.loop
+        if (
+            self.last_update_success
+            and self.entry.options.get(CONF_ALIGN_POLLS, DEFAULT_ALIGN_POLLS)
+            and (
+                delay := self.polling.next_poll_delay(
+                    dt_util.utcnow(), self.update_interval
+                )
+            )
+            is not None
+        ):
+            # Poll right after the collars are expected to report instead of
+            # in the slot of the account, the request rate limit still holds
+            _LOGGER.debug("Next fix expected, polling in %s", delay)
+            next_poll = loop.time() + delay.total_seconds()
         else:
-            # Build a dictionary with device data, keyed by device ID
-            data = {}
-            for device in devices:
-                if device.id:
-                    # Store the complete Device object
-                    # lastPos contains the latest location data
-                    data[device.id] = device
-
-            return data
+            next_poll = self.scheduler.next_poll(
+                self.entry.entry_id, loop.time(), interval
+            )
+        self._unsub_refresh = loop.call_at(next_poll, self._async_poll).cancel
+
+    @callback
+    def _async_poll(self) -> None:
+        """Start a scheduled poll."""
+        self.entry.async_create_background_task(
+            self.hass,
+            self._handle_refresh_interval(),
+            name=f"{DOMAIN} - {self.entry.title} - refresh",
+            eager_start=True,
+        )
+
+    @callback
+    def _async_adapt_interval(self, data: dict[str, Device]) -> None:
+        """Adjust the poll interval to what the collars currently need."""
+        interval = self.polling.update(data)
+        if interval == self.update_interval:
+            return
+
+        _LOGGER.debug(
+            "Changing poll interval from %s to %s", self.update_interval, interval
+        )
+        self.update_interval = interval
+
+    @callback
+    def _async_update_views(
+        self, data: dict[str, Device], device_ids: set[str] | None = None
+    ) -> None:
+        """Rebuild the collar views.
+
+        With ``device_ids`` only the views of those collars are rebuilt.
+        """
+        self._async_start_movement_period()
+        if device_ids is not None:
+            self.views = {
+                **self.views,
+                **{
+                    device_id: self._build_view(device_id, data[device_id])
+                    for device_id in device_ids
+                },
+            }
+            return
+
+        self.views = {
+            device_id: self._build_view(device_id, device)
+            for device_id, device in data.items()
+        }
+
+    @callback
+    def _async_fire_transitions(self, device_ids: Iterable[str]) -> None:
+        """Fire an event for every transition of the collars since last time."""
+        now = dt_util.utcnow()
+        battery_threshold = self.entry.options.get(
+            CONF_BATTERY_THRESHOLD, DEFAULT_BATTERY_THRESHOLD
+        )
+        silent_after = timedelta(
+            minutes=self.entry.options.get(CONF_SILENT_AFTER, DEFAULT_SILENT_AFTER)
+        )
+        for device_id in device_ids:
+            for event_type, event_data in self.transitions.update(
+                device_id,
+                self.views[device_id],
+                now,
+                battery_threshold,
+                silent_after,
+            ):
+                _LOGGER.debug("Collar %s: %s", device_id, event_type)
+                self.hass.bus.async_fire(event_type, event_data)
+
+    def _build_view(self, device_id: str, device: Device) -> CollarView:
+        """Return the view of a collar from its device and derived state."""
+        return build_view(
+            device_id,
+            device,
+            self.filters.get(device_id),
+            self.movement.get(device_id),
+            self.battery.get(device_id),
+            self.geofence_zones.get(device_id) if self.geofences else None,
+        )
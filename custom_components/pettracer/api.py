@@ -0,0 +1,304 @@
+"""Request layer between the coordinator and the petTracer client."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, TypeVar
+
+import aiohttp
+from pettracer import Device, LastPos, PetTracerClient, PetTracerError
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BACKOFF_INITIAL,
+    BACKOFF_MAX,
+    BREAKER_COOLDOWN,
+    BREAKER_COOLDOWN_MAX,
+    BREAKER_THRESHOLD,
+)
+
+if TYPE_CHECKING:
+    from .metrics import PetTracerMetrics
+    from .scheduler import PollScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Log in again this long before the token is due to expire
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(PetTracerError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class TokenBucket:
+    """Rate limiter that allows short bursts and a steady average rate."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize a full bucket refilling at rate tokens per second."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Take a token, waiting for one to become available."""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                # Waiting under the lock keeps the callers in order
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+    def drain(self) -> None:
+        """Empty the bucket, the server asked us to slow down."""
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+
+class CircuitBreaker:
+    """Stop calling a service that keeps failing and probe it for recovery.
+
+    Closed: requests pass. After BREAKER_THRESHOLD consecutive failures the
+    breaker opens and requests fail straight away for a cooldown. Then it is
+    half open and lets a single probe through: success closes the breaker,
+    failure opens it again with a doubled cooldown.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed breaker."""
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self._cooldown = BREAKER_COOLDOWN
+        self._opened_at = 0.0
+
+    @property
+    def remaining(self) -> float:
+        """Return the seconds until a probe is allowed, 0 if not open."""
+        if self.state != BREAKER_OPEN:
+            return 0.0
+        return max(self._opened_at + self._cooldown - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == BREAKER_OPEN and not self.remaining:
+            self.state = BREAKER_HALF_OPEN
+            return True
+        return self.state == BREAKER_CLOSED
+
+    def release(self) -> None:
+        """Let the next request probe again after the probe was abandoned."""
+        if self.state == BREAKER_HALF_OPEN:
+            # The cooldown has already passed, so the next allow() probes
+            self.state = BREAKER_OPEN
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        if self.state != BREAKER_CLOSED:
+            _LOGGER.info("petTracer API recovered, resuming requests")
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self._cooldown = BREAKER_COOLDOWN
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the breaker when needed."""
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN:
+            # The probe failed, wait longer before the next one
+            self._cooldown = min(self._cooldown * 2, BREAKER_COOLDOWN_MAX)
+        elif self.failures < BREAKER_THRESHOLD:
+            return
+        if self.state != BREAKER_OPEN:
+            _LOGGER.warning(
+                "petTracer API failed %d times in a row, pausing requests for %d s",
+                self.failures,
+                self._cooldown,
+            )
+        self.state = BREAKER_OPEN
+        self._opened_at = time.monotonic()
+
+
+class PetTracerApi:
+    """Send the requests of one account through the shared limits.
+
+    Every request waits for the shared concurrency limit and rate limiter,
+    and passes the circuit breaker of the account. Failures are counted to
+    work out how long to back off before the next poll.
+
+    The session is kept alive transparently: a request rejected because the
+    token expired logs in again and is retried once. Concurrent requests
+    that hit the same expired token wait for a single login.
+    """
+
+    def __init__(
+        self,
+        client: PetTracerClient,
+        scheduler: PollScheduler,
+        metrics: PetTracerMetrics,
+        username: str,
+        password: str,
+    ) -> None:
+        """Initialize the request layer."""
+        self.client = client
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self._username = username
+        self._password = password
+        self._login_lock = asyncio.Lock()
+        self.breaker = CircuitBreaker()
+        # Delay the server asked for with Retry-After, if any
+        self._retry_after: float | None = None
+
+    @property
+    def retry_delay(self) -> float | None:
+        """Return the seconds to wait before the next poll, None if healthy."""
+        if not self.breaker.failures:
+            return None
+        if self.breaker.state == BREAKER_OPEN:
+            return self.breaker.remaining or BACKOFF_INITIAL
+        # Exponential backoff with equal jitter, so accounts failing at the
+        # same time do not retry in lockstep
+        delay = min(BACKOFF_INITIAL * 2 ** (self.breaker.failures - 1), BACKOFF_MAX)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if self._retry_after is not None:
+            delay = max(delay, self._retry_after)
+        return delay
+
+    async def login(self) -> None:
+        """Log in to the petTracer API."""
+        await self._async_login(self.client.token)
+
+    async def get_all_devices(self) -> list[Device]:
+        """Return all collars of the account."""
+        return await self._async_call("getccs", self.client.get_all_devices)
+
+    async def get_device(self, device_id: int) -> Device:
+        """Return a single collar."""
+        info = await self._async_call(
+            "getccinfo", lambda: self.client.get_device(device_id).get_info()
+        )
+        # The endpoint answers with a list now and then
+        for device in info if isinstance(info, list) else [info]:
+            if device.id == device_id:
+                return device
+        raise PetTracerError(f"Collar {device_id} missing from getccinfo response")
+
+    async def get_positions(
+        self, device_id: int, start_ms: int, end_ms: int
+    ) -> list[LastPos]:
+        """Return the fixes of a collar between two times in milliseconds."""
+        return await self._async_call(
+            "getccpositions",
+            lambda: self.client.get_device(device_id).get_positions(start_ms, end_ms),
+        )
+
+    async def _async_call(
+        self, endpoint: str, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Send a request, logging in again if the session has expired."""
+        token = self.client.token
+        if not self.client.is_authenticated or self._token_expiring():
+            await self._async_login(token)
+            token = self.client.token
+
+        try:
+            return await self._async_send(endpoint, request)
+        except PetTracerError as err:
+            if not _is_auth_error(err):
+                raise
+            _LOGGER.debug("Session expired, logging in again: %s", err)
+
+        await self._async_login(token)
+        return await self._async_send(endpoint, request)
+
+    async def _async_login(self, stale_token: str | None) -> None:
+        """Log in, unless another request already replaced the stale token."""
+        async with self._login_lock:
+            if self.client.token != stale_token and self.client.is_authenticated:
+                return
+            await self._async_send(
+                "login",
+                lambda: self.client.login(self._username, self._password, timeout=10),
+            )
+            _LOGGER.debug("Logged in to petTracer")
+
+    def _token_expiring(self) -> bool:
+        """Return whether the token is about to expire."""
+        if (expires := self.client.token_expires) is None:
+            return False
+        # The login response only carries a date, parsed as a naive datetime
+        return dt_util.as_utc(expires) - dt_util.utcnow() < TOKEN_REFRESH_MARGIN
+
+    async def _async_send(
+        self, endpoint: str, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Send a request, subject to the limits and the circuit breaker."""
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                "petTracer API is unavailable, next attempt in "
+                f"{self.breaker.remaining:.0f} s"
+            )
+
+        try:
+            async with self.scheduler.requests:
+                await self.scheduler.rate_limit.acquire()
+                with self.metrics.measure_request(endpoint):
+                    result = await request()
+        except TimeoutError as err:
+            # The client only wraps aiohttp errors, not the total timeout
+            self._record_failure(err)
+            raise PetTracerError("Timeout talking to petTracer API") from err
+        except PetTracerError as err:
+            self._record_failure(err)
+            raise
+        except Exception as err:
+            # Not wrapped by the client either, like a response it cannot parse
+            self._record_failure(err)
+            raise
+        except BaseException:
+            # Cancelled before an answer came, nothing was learned about the
+            # API. A half open breaker must not wait for this probe forever.
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success()
+        self._retry_after = None
+        return result
+
+    def _record_failure(self, err: Exception) -> None:
+        """Record a failed request."""
+        self.breaker.record_failure()
+        cause = err.__cause__
+        if isinstance(cause, aiohttp.ClientResponseError) and cause.status == 429:
+            # Rate limited, slow down every account sharing the limiter
+            self.scheduler.rate_limit.drain()
+            retry_after = (cause.headers or {}).get("Retry-After", "")
+            self._retry_after = float(retry_after) if retry_after.isdigit() else None
+
+
+def _is_auth_error(err: PetTracerError) -> bool:
+    """Return whether a request failed because the session is not valid."""
+    cause = err.__cause__
+    if isinstance(cause, aiohttp.ClientResponseError):
+        return cause.status in (401, 403)
+    # Raised by the client itself when it has no token
+    return str(err).startswith("Not authenticated")
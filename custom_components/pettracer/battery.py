@@ -0,0 +1,143 @@
+"""Battery model for petTracer collars."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import math
+from typing import Any
+
+# Open circuit voltage (mV) against state of charge (%) of a single Li-ion
+# cell under a light load. The curve is flat between roughly 3.7 and 3.9 V,
+# which is why a straight line between 3.3 and 4.2 V is far off.
+DISCHARGE_CURVE: tuple[tuple[int, int], ...] = (
+    (3300, 0),
+    (3610, 5),
+    (3690, 10),
+    (3710, 15),
+    (3730, 20),
+    (3750, 25),
+    (3770, 30),
+    (3790, 35),
+    (3800, 40),
+    (3820, 45),
+    (3840, 50),
+    (3850, 55),
+    (3870, 60),
+    (3910, 65),
+    (3950, 70),
+    (3980, 75),
+    (4020, 80),
+    (4080, 85),
+    (4110, 90),
+    (4150, 95),
+    (4200, 100),
+)
+_VOLTAGES = [voltage for voltage, _ in DISCHARGE_CURVE]
+
+# Samples lose half of their weight in the drain estimate after this long
+DRAIN_HALF_LIFE = 12 * 3600
+# Minimum spread in time (standard deviation, seconds) of the samples before
+# a drain rate is reported
+MIN_DRAIN_SPREAD = 1800
+
+
+def battery_percentage(voltage: int) -> int:
+    """Return the state of charge for a battery voltage in mV."""
+    if voltage <= _VOLTAGES[0]:
+        return 0
+    if voltage >= _VOLTAGES[-1]:
+        return 100
+
+    index = bisect_left(_VOLTAGES, voltage)
+    high_voltage, high_level = DISCHARGE_CURVE[index]
+    low_voltage, low_level = DISCHARGE_CURVE[index - 1]
+    fraction = (voltage - low_voltage) / (high_voltage - low_voltage)
+    return round(low_level + fraction * (high_level - low_level))
+
+
+class DrainEstimator:
+    """Exponentially weighted least squares fit of battery level over time.
+
+    Only five running sums are kept and every sample updates them in
+    constant time. Times are stored relative to the newest sample, so the
+    sums stay small however long the estimator runs. The fit starts over
+    after charging, since the drain after a charge says nothing about the
+    drain before it.
+    """
+
+    __slots__ = ("_last_time", "_s0", "_st", "_stt", "_sty", "_sy", "level")
+
+    def __init__(self) -> None:
+        """Initialize an empty estimator."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self._last_time: float | None = None
+        self._s0 = self._st = self._stt = self._sy = self._sty = 0.0
+        self.level: int | None = None
+
+    def add(self, time: float, level: int) -> bool:
+        """Add a battery level sample, return False if it is not newer."""
+        if self._last_time is not None:
+            shift = time - self._last_time
+            if shift <= 0:
+                return False
+            # Move the origin to the new sample and decay the old samples
+            decay = math.exp(-shift * math.log(2) / DRAIN_HALF_LIFE)
+            self._stt = (
+                self._stt - 2 * shift * self._st + shift**2 * self._s0
+            ) * decay
+            self._sty = (self._sty - shift * self._sy) * decay
+            self._st = (self._st - shift * self._s0) * decay
+            self._s0 *= decay
+            self._sy *= decay
+
+        self._s0 += 1
+        self._sy += level
+        self._last_time = time
+        self.level = level
+        return True
+
+    @property
+    def drain_rate(self) -> float | None:
+        """Return the fitted drain in % per hour, None if unknown."""
+        if self._s0 < 2:
+            return None
+        mean_t = self._st / self._s0
+        variance = self._stt / self._s0 - mean_t**2
+        if variance < MIN_DRAIN_SPREAD**2:
+            return None
+        slope = (self._sty / self._s0 - mean_t * self._sy / self._s0) / variance
+        return -slope * 3600
+
+    @property
+    def time_remaining(self) -> float | None:
+        """Return the hours until the battery is empty, None if unknown."""
+        rate = self.drain_rate
+        if rate is None or rate <= 0 or self.level is None:
+            return None
+        return max(self.level, 0) / rate
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the estimator for storage."""
+        return {
+            "last_time": self._last_time,
+            "sums": [self._s0, self._st, self._stt, self._sy, self._sty],
+            "level": self.level,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DrainEstimator:
+        """Restore an estimator from storage."""
+        estimator = cls()
+        estimator._last_time = data["last_time"]
+        (
+            estimator._s0,
+            estimator._st,
+            estimator._stt,
+            estimator._sy,
+            estimator._sty,
+        ) = data["sums"]
+        estimator.level = data["level"]
+        return estimator
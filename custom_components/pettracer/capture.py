@@ -0,0 +1,252 @@
+"""Capture of the raw petTracer API traffic, to replay it later."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import gzip
+import json
+import logging
+from pathlib import Path
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Directory below the HA config directory captures are written to
+CAPTURE_DIR = "pettracer_captures"
+
+# Captured requests are appended to the file this often
+CAPTURE_FLUSH_INTERVAL = timedelta(minutes=1)
+
+# The login request carries the password and its response the token, only
+# the fact that a login happened is recorded
+LOGIN_PATH = "/api/user/login"
+
+
+@dataclass(slots=True, eq=False)
+class Exchange:
+    """A request and its response as sent over the wire."""
+
+    time: float
+    method: str
+    path: str
+    request: bytearray = field(default_factory=bytearray)
+    response: bytearray = field(default_factory=bytearray)
+    status: int | None = None
+    error: str | None = None
+    # Kept to tell when the whole body was received
+    client_response: aiohttp.ClientResponse | None = None
+
+    @property
+    def done(self) -> bool:
+        """Return whether nothing more is going to be received."""
+        if self.error is not None:
+            return True
+        response = self.client_response
+        return (
+            response is not None
+            and response.closed
+            # Error responses are released without reading the body
+            and (bool(self.response) or response.status >= 300)
+        )
+
+    def as_json(self) -> str:
+        """Return the exchange as a line of the capture file."""
+        private = self.path == LOGIN_PATH
+        return json.dumps(
+            {
+                "time": round(self.time, 3),
+                "method": self.method,
+                "path": self.path,
+                "status": self.status,
+                "error": self.error,
+                "request": None
+                if private or not self.request
+                else self.request.decode("utf-8", "replace"),
+                "response": None
+                if private or not self.response
+                else self.response.decode("utf-8", "replace"),
+            },
+            separators=(",", ":"),
+        )
+
+
+class TrafficCapture:
+    """Record the requests of the shared session to a gzipped JSON lines file.
+
+    The trace hooks stay attached to the session and return straight away
+    while no capture runs. Bodies are kept as received, so odd timestamp
+    formats or repeated fixes can be replayed exactly. Exchanges are written
+    out in the executor once a minute.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a capture that is not running."""
+        self.path: Path | None = None
+        self.until: datetime | None = None
+        self.count = 0
+        self._hass: HomeAssistant | None = None
+        self._pending: list[Exchange] = []
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Return whether a capture is running."""
+        return self.path is not None
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return trace hooks that record the exchanges while capturing."""
+
+        async def on_request_start(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestStartParams,
+        ) -> None:
+            context.exchange = (
+                Exchange(time.time(), params.method, params.url.path)
+                if self.active
+                else None
+            )
+
+        async def on_request_chunk_sent(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestChunkSentParams,
+        ) -> None:
+            if exchange := context.exchange:
+                exchange.request += params.chunk
+
+        async def on_request_end(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestEndParams,
+        ) -> None:
+            if (exchange := context.exchange) and self.active:
+                exchange.status = params.response.status
+                exchange.client_response = params.response
+                self._pending.append(exchange)
+
+        async def on_response_chunk_received(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceResponseChunkReceivedParams,
+        ) -> None:
+            if exchange := context.exchange:
+                exchange.response += params.chunk
+
+        async def on_request_exception(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestExceptionParams,
+        ) -> None:
+            if (exchange := context.exchange) and self.active:
+                exchange.error = repr(params.exception)
+                self._pending.append(exchange)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_response_chunk_received.append(on_response_chunk_received)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+    @callback
+    def async_start(
+        self, hass: HomeAssistant, path: Path, duration: timedelta
+    ) -> None:
+        """Start capturing to a file for a while."""
+        if self.active:
+            raise RuntimeError(f"Already capturing to {self.path}")
+        self._hass = hass
+        self.path = path
+        self.until = dt_util.utcnow() + duration
+        self.count = 0
+        self._unsubs = [
+            async_track_time_interval(
+                hass,
+                self._async_flush,
+                CAPTURE_FLUSH_INTERVAL,
+                name="pettracer capture flush",
+                cancel_on_shutdown=True,
+            ),
+            async_call_later(hass, duration, self._async_finished),
+            # Write out the rest before Home Assistant stops
+            hass.bus.async_listen(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_finished
+            ),
+        ]
+        _LOGGER.info(
+            "Capturing petTracer API traffic to %s until %s", path, self.until
+        )
+
+    async def async_stop(self) -> Path | None:
+        """Stop capturing and write out what is left, return the file."""
+        if (path := self.path) is None:
+            return None
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        await self._async_flush(final=True)
+        self.path = self.until = self._hass = None
+        self._pending = []
+        _LOGGER.info("Captured %d petTracer API requests to %s", self.count, path)
+        return path
+
+    async def _async_finished(self, _event: datetime | Event) -> None:
+        """Stop once the capture time is up or Home Assistant stops."""
+        await self.async_stop()
+
+    async def _async_flush(
+        self, _now: datetime | None = None, final: bool = False
+    ) -> None:
+        """Append the finished exchanges to the capture file."""
+        if self.path is None or self._hass is None:
+            return
+        lines: list[str] = []
+        pending: list[Exchange] = []
+        for exchange in self._pending:
+            if final or exchange.done:
+                lines.append(exchange.as_json())
+            else:
+                pending.append(exchange)
+        self._pending = pending
+        if not lines:
+            return
+        self.count += len(lines)
+        async with self._write_lock:
+            try:
+                await self._hass.async_add_executor_job(
+                    write_capture, self.path, lines
+                )
+            except OSError as err:
+                _LOGGER.error("Failed to write the capture %s: %s", self.path, err)
+
+
+def write_capture(path: Path, lines: list[str]) -> None:
+    """Append lines to a capture file, runs in the executor.
+
+    Every write adds a gzip member, readers see them as one stream.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        file.writelines(line + "\n" for line in lines)
+
+
+def read_capture(path: Path) -> list[dict[str, Any]]:
+    """Return the exchanges of a capture file, oldest first."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        exchanges = [json.loads(line) for line in file if line.strip()]
+    exchanges.sort(key=lambda exchange: exchange["time"])
+    return exchanges
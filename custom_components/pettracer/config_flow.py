@@ -8,13 +8,44 @@ from typing import Any
 import aiohttp
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from pettracer import PetTracerClient, PetTracerError
 
-from .const import DOMAIN
+from .const import (
+    CONF_ALIGN_POLLS,
+    CONF_BATTERY_THRESHOLD,
+    CONF_GEOFENCE_FILE,
+    CONF_HISTORY_MAX_AGE,
+    CONF_HISTORY_SIZE,
+    CONF_LEAN_ATTRIBUTES,
+    CONF_MAX_ACCURACY,
+    CONF_MOVEMENT_RESET,
+    CONF_POSITION_FILTER,
+    CONF_SILENT_AFTER,
+    CONF_STALE_GRACE,
+    DEFAULT_ALIGN_POLLS,
+    DEFAULT_BATTERY_THRESHOLD,
+    DEFAULT_GEOFENCE_FILE,
+    DEFAULT_HISTORY_MAX_AGE,
+    DEFAULT_HISTORY_SIZE,
+    DEFAULT_LEAN_ATTRIBUTES,
+    DEFAULT_MAX_ACCURACY,
+    DEFAULT_MOVEMENT_RESET,
+    DEFAULT_POSITION_FILTER,
+    DEFAULT_SILENT_AFTER,
+    DEFAULT_STALE_GRACE,
+    DOMAIN,
+    MOVEMENT_RESET_OPTIONS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -90,6 +121,12 @@ class PetTracerConfigFlow(ConfigFlow, domain=DOMAIN):
     VERSION = 1
     MINOR_VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return PetTracerOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -127,6 +164,80 @@ class PetTracerConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+class PetTracerOptionsFlow(OptionsFlow):
+    """Handle petTracer options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_HISTORY_SIZE,
+                        default=options.get(CONF_HISTORY_SIZE, DEFAULT_HISTORY_SIZE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=100000)),
+                    vol.Required(
+                        CONF_HISTORY_MAX_AGE,
+                        default=options.get(
+                            CONF_HISTORY_MAX_AGE, DEFAULT_HISTORY_MAX_AGE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=24 * 31)),
+                    vol.Required(
+                        CONF_MOVEMENT_RESET,
+                        default=options.get(
+                            CONF_MOVEMENT_RESET, DEFAULT_MOVEMENT_RESET
+                        ),
+                    ): vol.In(MOVEMENT_RESET_OPTIONS),
+                    vol.Required(
+                        CONF_MAX_ACCURACY,
+                        default=options.get(CONF_MAX_ACCURACY, DEFAULT_MAX_ACCURACY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=1000)),
+                    vol.Required(
+                        CONF_GEOFENCE_FILE,
+                        default=options.get(CONF_GEOFENCE_FILE, DEFAULT_GEOFENCE_FILE),
+                    ): str,
+                    vol.Required(
+                        CONF_POSITION_FILTER,
+                        default=options.get(
+                            CONF_POSITION_FILTER, DEFAULT_POSITION_FILTER
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_LEAN_ATTRIBUTES,
+                        default=options.get(
+                            CONF_LEAN_ATTRIBUTES, DEFAULT_LEAN_ATTRIBUTES
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_STALE_GRACE,
+                        default=options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=24 * 60)),
+                    vol.Required(
+                        CONF_BATTERY_THRESHOLD,
+                        default=options.get(
+                            CONF_BATTERY_THRESHOLD, DEFAULT_BATTERY_THRESHOLD
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=95)),
+                    vol.Required(
+                        CONF_SILENT_AFTER,
+                        default=options.get(CONF_SILENT_AFTER, DEFAULT_SILENT_AFTER),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=7 * 24 * 60)),
+                    vol.Required(
+                        CONF_ALIGN_POLLS,
+                        default=options.get(CONF_ALIGN_POLLS, DEFAULT_ALIGN_POLLS),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
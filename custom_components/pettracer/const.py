@@ -1,5 +1,7 @@
 """Constants for the petTracer integration."""
 
+from datetime import timedelta
+
 from homeassistant.const import Platform
 
 DOMAIN = "pettracer"
@@ -11,3 +13,147 @@ PLATFORMS: list[Platform] = [
     Platform.DEVICE_TRACKER,
     Platform.SENSOR,
 ]
+
+# Adaptive polling. The account is polled at the shortest interval wanted by
+# any of its collars.
+POLL_INTERVAL_FAST = timedelta(seconds=30)
+POLL_INTERVAL_NORMAL = timedelta(minutes=1)
+POLL_INTERVAL_STATIONARY = timedelta(minutes=5)
+POLL_INTERVAL_SLOW_MODE = timedelta(minutes=5)
+POLL_INTERVAL_CHARGING = timedelta(minutes=10)
+
+# Polls timed to the reporting cadence of the collars. Cadences are learned
+# from successive fixes within these bounds, the poll follows the expected
+# fix by a margin.
+CADENCE_MIN = timedelta(seconds=10)
+CADENCE_MAX = timedelta(minutes=30)
+CADENCE_SMOOTHING = 0.3
+CADENCE_MARGIN = timedelta(seconds=5)
+
+# Live tracking polls a single collar on its own this often, for a while
+POLL_INTERVAL_LIVE = timedelta(seconds=10)
+LIVE_TRACKING_DURATION = timedelta(minutes=15)
+LIVE_TRACKING_MAX_DURATION = timedelta(hours=2)
+
+# Raw API traffic is captured this long by default, for replaying it later
+CAPTURE_DURATION = timedelta(hours=1)
+CAPTURE_MAX_DURATION = timedelta(days=7)
+
+# All accounts share one connection pool and are polled in turn. The polls
+# of N accounts are spread evenly over the poll interval, and a poll is never
+# scheduled less than this fraction of an interval after the previous one.
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+MAX_CONNECTIONS = 4
+MAX_CONCURRENT_REQUESTS = 2
+MIN_POLL_SPACING = 0.5
+
+# Fixes further apart than this are not used for speed, time away or dwell
+# time, the collar was most likely out of reach in between
+MAX_FIX_GAP = 30 * 60
+
+# Successful refreshes in a row a collar has to be missing from before its
+# device is removed, a partial response must not wipe names and areas
+STALE_DEVICE_REFRESHES = 3
+
+# Collars can be shared between accounts. Each is tracked by one entry only,
+# the account that owns it if that one is set up, else the first to see it.
+DATA_COLLARS = f"{DOMAIN}_collars"
+
+# Requests per second allowed across all accounts, with short bursts
+REQUEST_RATE = 1.0
+REQUEST_BURST = 10
+
+# Backoff after failed polls, in seconds. The delay doubles with every
+# failure and is jittered so accounts do not retry in lockstep.
+BACKOFF_INITIAL = 30
+BACKOFF_MAX = 15 * 60
+
+# After this many failures in a row requests stop for a cooldown, then a
+# single probe checks whether the API is back. Failed probes double it.
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 5 * 60
+BREAKER_COOLDOWN_MAX = 60 * 60
+
+# A collar counts as stationary once it has not moved for this long
+STATIONARY_AFTER = timedelta(minutes=10)
+
+# Minimum distance (meters) between fixes that counts as movement. The fix
+# accuracy is used instead when it is larger.
+MOVEMENT_THRESHOLD = 25
+
+# modeSet value reported by collars in "Slow" tracking mode
+TRACKING_MODE_SLOW = 3
+
+# Persisted snapshot of the last refresh, used to start without waiting on
+# the petTracer cloud
+STORAGE_KEY = DOMAIN
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 300
+
+# Options
+CONF_HISTORY_SIZE = "history_size"
+CONF_HISTORY_MAX_AGE = "history_max_age"
+CONF_MOVEMENT_RESET = "movement_reset"
+CONF_MAX_ACCURACY = "max_accuracy"
+CONF_GEOFENCE_FILE = "geofence_file"
+CONF_POSITION_FILTER = "position_filter"
+CONF_LEAN_ATTRIBUTES = "lean_attributes"
+CONF_STALE_GRACE = "stale_grace"
+CONF_BATTERY_THRESHOLD = "battery_threshold"
+CONF_SILENT_AFTER = "silent_after"
+CONF_ALIGN_POLLS = "align_polls"
+
+# Default to a day of one-minute fixes per collar
+DEFAULT_HISTORY_SIZE = 1440
+DEFAULT_HISTORY_MAX_AGE = 24  # hours
+
+# When the movement statistics (distance, max speed, time away) start over
+MOVEMENT_RESET_DAILY = "daily"
+MOVEMENT_RESET_WEEKLY = "weekly"
+MOVEMENT_RESET_MONTHLY = "monthly"
+MOVEMENT_RESET_NEVER = "never"
+MOVEMENT_RESET_OPTIONS = [
+    MOVEMENT_RESET_DAILY,
+    MOVEMENT_RESET_WEEKLY,
+    MOVEMENT_RESET_MONTHLY,
+    MOVEMENT_RESET_NEVER,
+]
+DEFAULT_MOVEMENT_RESET = MOVEMENT_RESET_DAILY
+
+# Fixes less accurate than this (meters) are left out of movement statistics
+DEFAULT_MAX_ACCURACY = 50
+
+# GeoJSON file with polygon zones, relative to the HA config directory
+DEFAULT_GEOFENCE_FILE = "pettracer_zones.geojson"
+
+# Smooth out GPS jitter and drop implausible jumps before showing positions
+DEFAULT_POSITION_FILTER = True
+
+# Leave values that change with every fix out of the device tracker state
+DEFAULT_LEAN_ATTRIBUTES = False
+
+# Minutes the last good data keeps being shown while refreshes fail
+DEFAULT_STALE_GRACE = 30
+
+# Battery level (%) below which a collar counts as low, 0 to turn off
+DEFAULT_BATTERY_THRESHOLD = 20
+
+# Minutes without contact after which a collar counts as silent, 0 to turn off
+DEFAULT_SILENT_AFTER = 60
+
+# Time polls to when the collars are expected to report
+DEFAULT_ALIGN_POLLS = False
+
+# Events
+EVENT_ZONE_ENTERED = f"{DOMAIN}_zone_entered"
+EVENT_ZONE_LEFT = f"{DOMAIN}_zone_left"
+EVENT_EXPORT_FINISHED = f"{DOMAIN}_export_finished"
+EVENT_CHARGING_STARTED = f"{DOMAIN}_charging_started"
+EVENT_CHARGING_STOPPED = f"{DOMAIN}_charging_stopped"
+EVENT_BATTERY_LOW = f"{DOMAIN}_battery_low"
+EVENT_BATTERY_RECOVERED = f"{DOMAIN}_battery_recovered"
+EVENT_LIVE_TRACKING_STARTED = f"{DOMAIN}_live_tracking_started"
+EVENT_LIVE_TRACKING_STOPPED = f"{DOMAIN}_live_tracking_stopped"
+EVENT_COLLAR_SILENT = f"{DOMAIN}_collar_silent"
+EVENT_COLLAR_RECONNECTED = f"{DOMAIN}_collar_reconnected"
+EVENT_TRACKING_MODE_CHANGED = f"{DOMAIN}_tracking_mode_changed"
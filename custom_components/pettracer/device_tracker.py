@@ -7,15 +7,22 @@ from typing import Any
 
 from homeassistant.components.device_tracker import SourceType, TrackerEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import PetTracerDataUpdateCoordinator
-from .const import DOMAIN
+from .const import CONF_LEAN_ATTRIBUTES, DEFAULT_LEAN_ATTRIBUTES, DOMAIN
+from .entity import PetTracerEntity
+from .model import CollarView
 
 _LOGGER = logging.getLogger(__name__)
 
+# Attributes that change with nearly every poll. Each has a sensor of its own,
+# so they are not recorded, and left out completely in lean mode.
+VOLATILE_ATTRIBUTES = frozenset(
+    {"battery_voltage", "last_contact", "last_update", "satellites", "signal_strength"}
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -24,24 +31,33 @@ async def async_setup_entry(
 ) -> None:
     """Set up petTracer device tracker entities from config entry."""
     coordinator: PetTracerDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-
-    entities = []
-    if coordinator.data:
-        for device_id, device in coordinator.data.items():
-            # device is a Device dataclass object
-            device_name = (
-                device.details.name if device.details else f"Pet Tracker {device_id}"
+    added: set[str] = set()
+
+    @callback
+    def _async_add_new_collars() -> None:
+        """Add trackers for collars that are not set up yet."""
+        # Collars that left the account are removed with their device
+        added.intersection_update(coordinator.collar_ids)
+        new = coordinator.views.keys() - added
+        if not new:
+            return
+        added.update(new)
+        async_add_entities(
+            PetTracerDeviceTracker(
+                coordinator, device_id, coordinator.views[device_id].name
             )
-            entities.append(PetTracerDeviceTracker(coordinator, device_id, device_name))
+            for device_id in new
+        )
 
-    async_add_entities(entities)
+    _async_add_new_collars()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_collars))
 
 
-class PetTracerDeviceTracker(CoordinatorEntity, TrackerEntity):
+class PetTracerDeviceTracker(PetTracerEntity, TrackerEntity):
     """Representation of a petTracer device tracker."""
 
-    _attr_has_entity_name = True
     _attr_name = None
+    _unrecorded_attributes = VOLATILE_ATTRIBUTES
 
     def __init__(
         self,
@@ -50,108 +66,104 @@ class PetTracerDeviceTracker(CoordinatorEntity, TrackerEntity):
         device_name: str,
     ) -> None:
         """Initialize the petTracer device tracker."""
-        super().__init__(coordinator)
-        self._device_id = device_id
-        self._device_name = device_name
+        super().__init__(coordinator, device_id, device_name)
         self._attr_unique_id = f"{DOMAIN}_{device_id}"
         self._attr_source_type = SourceType.GPS
+        self._lean = coordinator.entry.options.get(
+            CONF_LEAN_ATTRIBUTES, DEFAULT_LEAN_ATTRIBUTES
+        )
+
+    def _entity_state(self) -> tuple[Any, ...]:
+        """Return everything the tracker shows."""
+        # Trackers force every write into a new state and recorder row, even
+        # an identical one, so unchanged trackers are not written at all
+        return (
+            self.available,
+            self.latitude,
+            self.longitude,
+            self.location_accuracy,
+            self.battery_level,
+            self.extra_state_attributes,
+        )
 
     @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information about this tracker."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_name,
-            "manufacturer": "petTracer",
-            "model": "Pet Collar",
-        }
+    def _view(self) -> CollarView | None:
+        """Return the current view of the collar."""
+        return self.coordinator.views.get(self._device_id)
 
     @property
     def latitude(self) -> float | None:
         """Return latitude value of the device."""
-        if not self.coordinator.data or self._device_id not in self.coordinator.data:
-            return None
-
-        device = self.coordinator.data[self._device_id]
-        return device.lastPos.posLat if device.lastPos else None
+        return view.latitude if (view := self._view) else None
 
     @property
     def longitude(self) -> float | None:
         """Return longitude value of the device."""
-        if not self.coordinator.data or self._device_id not in self.coordinator.data:
-            return None
-
-        device = self.coordinator.data[self._device_id]
-        return device.lastPos.posLong if device.lastPos else None
+        return view.longitude if (view := self._view) else None
 
     @property
     def location_accuracy(self) -> int:
         """Return the location accuracy of the device."""
-        if not self.coordinator.data or self._device_id not in self.coordinator.data:
-            return 0
-
-        device = self.coordinator.data[self._device_id]
-        return device.lastPos.acc if device.lastPos and device.lastPos.acc else 0
+        return view.accuracy if (view := self._view) else 0
 
     @property
     def battery_level(self) -> int | None:
         """Return the battery level of the device."""
-        if not self.coordinator.data or self._device_id not in self.coordinator.data:
-            return None
-
-        device = self.coordinator.data[self._device_id]
-        # Convert battery voltage (mV) to approximate percentage
-        # Typical range: 3300mV (empty) to 4200mV (full)
-        if device.bat:
-            return min(100, max(0, int((device.bat - 3300) / 9)))
-        return None
+        return view.battery_level if (view := self._view) else None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
         attrs = {}
 
-        if not self.coordinator.data or self._device_id not in self.coordinator.data:
+        if (view := self._view) is None:
             return attrs
 
-        device = self.coordinator.data[self._device_id]
-
         # Add battery voltage (mV)
-        if device.bat:
-            attrs["battery_voltage"] = device.bat
+        if view.battery_voltage:
+            attrs["battery_voltage"] = view.battery_voltage
 
         # Add last position timestamp
-        if device.lastPos and device.lastPos.timeMeasure:
-            attrs["last_update"] = device.lastPos.timeMeasure
+        if view.last_update:
+            attrs["last_update"] = view.last_update
 
         # Add last contact with device
-        if device.lastContact:
-            attrs["last_contact"] = device.lastContact
+        if view.last_contact:
+            attrs["last_contact"] = view.last_contact
 
         # Add GPS quality info
-        if device.lastPos:
-            if device.lastPos.sat is not None:
-                attrs["satellites"] = device.lastPos.sat
-            if device.lastPos.rssi is not None:
-                attrs["signal_strength"] = device.lastPos.rssi
+        if view.satellites is not None:
+            attrs["satellites"] = view.satellites
+        if view.signal_strength is not None:
+            attrs["signal_strength"] = view.signal_strength
 
         # Add device status
-        if device.status is not None:
-            attrs["status"] = device.status
-        if device.mode is not None:
-            attrs["mode"] = device.mode
+        if view.status is not None:
+            attrs["status"] = view.status
+        if view.mode is not None:
+            attrs["mode"] = view.mode
 
         # Add charging status
-        if device.chg is not None:
-            attrs["charging"] = "Charging" if device.chg == 1 else "Not charging"
+        if view.charging_status is not None:
+            attrs["charging"] = view.charging_status
 
         # Add tracking mode
-        if device.modeSet is not None:
-            modes = {1: "Fast", 2: "Normal", 3: "Slow"}
-            attrs["tracking_mode"] = modes.get(device.modeSet, "Unknown")
+        if view.tracking_mode is not None:
+            attrs["tracking_mode"] = view.tracking_mode
 
         # Add live tracking status
-        if device.search is not None:
-            attrs["live_tracking"] = "On" if device.search else "Off"
-
+        if view.search_status is not None:
+            attrs["live_tracking"] = view.search_status
+
+        # Updates are failing, this is the last data that came through
+        if not self.coordinator.last_update_success:
+            attrs["stale"] = True
+
+        if self._lean:
+            # Only a move or a change of status makes a new state
+            return {
+                key: value
+                for key, value in attrs.items()
+                if key not in VOLATILE_ATTRIBUTES
+            }
         return attrs
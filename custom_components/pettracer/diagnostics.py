@@ -0,0 +1,76 @@
+"""Diagnostics support for petTracer."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import PetTracerDataUpdateCoordinator
+from .const import DATA_SCHEDULER, DOMAIN
+from .storage import device_to_json
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    "access_token",
+    "token",
+    "title",
+    "unique_id",
+    # Where the pets are, and who they belong to
+    "posLat",
+    "posLong",
+    "name",
+    "userId",
+    "masterHs",
+    "fiFo",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: PetTracerDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    api = coordinator.api
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "update_interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None,
+            "last_update_success": coordinator.last_update_success,
+            "restored": coordinator.restored,
+            "accounts": len(hass.data[DATA_SCHEDULER]),
+            "live_tracking": {
+                str(device_id): until.isoformat()
+                for device_id, until in coordinator.live_tracking.items()
+            },
+            "cadences": coordinator.polling.cadences,
+        },
+        "api": {
+            "authenticated": api.client.is_authenticated,
+            "token_expires": expires.isoformat()
+            if (expires := api.client.token_expires)
+            else None,
+            "breaker_state": api.breaker.state,
+            "consecutive_failures": api.breaker.failures,
+            "retry_delay": api.retry_delay,
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "collars": {
+            device_id: {
+                "history_fixes": len(history),
+                "history_bytes": history.nbytes,
+            }
+            for device_id, history in coordinator.history.items()
+        },
+        "devices": async_redact_data(
+            [device_to_json(device) for device in (coordinator.data or {}).values()],
+            TO_REDACT,
+        ),
+    }
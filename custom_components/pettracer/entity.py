@@ -0,0 +1,85 @@
+"""Base entity for the petTracer integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from pettracer import PetTracerError
+
+from . import PetTracerDataUpdateCoordinator
+from .const import DOMAIN
+
+
+class PetTracerEntity(CoordinatorEntity[PetTracerDataUpdateCoordinator]):
+    """Base class for entities that belong to a single petTracer collar."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: PetTracerDataUpdateCoordinator,
+        device_id: str,
+        device_name: str,
+    ) -> None:
+        """Initialize the petTracer entity."""
+        super().__init__(coordinator, context=device_id)
+        self._device_id = device_id
+        self._device_name = device_name
+        # Everything the entity showed when its state was last written
+        self._last_state: tuple[Any, ...] | None = None
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        """Return device information about this collar."""
+        return {
+            "identifiers": {(DOMAIN, self._device_id)},
+            "name": self._device_name,
+            "manufacturer": "petTracer",
+            "model": "Pet Collar",
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if the data of the collar is recent enough to show."""
+        return self.coordinator.data_available
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state the entity was added with."""
+        await super().async_added_to_hass()
+        self._last_state = self._entity_state()
+
+    async def async_update(self) -> None:
+        """Fetch only this collar when asked to update the entity."""
+        if not self.enabled:
+            return
+        try:
+            await self.coordinator.async_refresh_collars([self._device_id])
+        except PetTracerError as err:
+            raise HomeAssistantError(
+                f"Failed to update {self._device_name}: {err}"
+            ) from err
+
+    def _entity_state(self) -> tuple[Any, ...]:
+        """Return everything the entity shows."""
+        return (self.available,)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when something the entity shows changed.
+
+        A collar reports its contact time and satellites with nearly every
+        fix, so comparing whole collars would still write all of its
+        entities on every poll.
+        """
+        if self._entity_state() != self._last_state:
+            self._async_write_coordinator_state()
+
+    @callback
+    def _async_write_coordinator_state(self) -> None:
+        """Write the state and remember what it was written with."""
+        self._last_state = self._entity_state()
+        self.coordinator.metrics.state_written()
+        super()._handle_coordinator_update()
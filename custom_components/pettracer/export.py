@@ -0,0 +1,93 @@
+"""GPX and GeoJSON track export for petTracer collars."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from itertools import batched
+import json
+import os
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from .history import Fix
+
+FORMAT_GPX = "gpx"
+FORMAT_GEOJSON = "geojson"
+EXPORT_FORMATS = (FORMAT_GPX, FORMAT_GEOJSON)
+
+# Directory below the HA config directory the tracks are written to
+EXPORT_DIR = "pettracer_exports"
+
+# Fixes rendered per write, keeps memory flat whatever the size of the track
+CHUNK_FIXES = 1000
+
+
+def _format_time(time: float) -> str:
+    """Format a fix time as an ISO 8601 UTC timestamp."""
+    return datetime.fromtimestamp(time, UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def iter_gpx(name: str, fixes: Iterable[Fix]) -> Iterator[str]:
+    """Yield a GPX 1.1 document with one track, a piece at a time."""
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="Home Assistant petTracer" '
+        'xmlns="http://www.topografix.com/GPX/1/1">\n'
+        f"<trk><name>{escape(name)}</name><trkseg>\n"
+    )
+    for fix in fixes:
+        point = (
+            f"<trkpt lat={quoteattr(repr(fix.latitude))} "
+            f"lon={quoteattr(repr(fix.longitude))}>"
+            f"<time>{_format_time(fix.time)}</time>"
+        )
+        if fix.satellites is not None:
+            point += f"<sat>{fix.satellites}</sat>"
+        yield point + "</trkpt>\n"
+    yield "</trkseg></trk>\n</gpx>\n"
+
+
+def iter_geojson(name: str, fixes: Iterable[Fix]) -> Iterator[str]:
+    """Yield a GeoJSON feature collection with a point per fix."""
+    yield (
+        '{"type": "FeatureCollection", "name": '
+        + json.dumps(name)
+        + ', "features": [\n'
+    )
+    separator = ""
+    for fix in fixes:
+        feature = {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [fix.longitude, fix.latitude],
+            },
+            "properties": {
+                "time": _format_time(fix.time),
+                "accuracy": fix.accuracy,
+                "satellites": fix.satellites,
+                "rssi": fix.rssi,
+            },
+        }
+        yield separator + json.dumps(feature)
+        separator = ",\n"
+    yield "\n]}\n"
+
+
+def write_track(path: Path, chunks: Iterable[str]) -> None:
+    """Write a document to a file chunk by chunk.
+
+    The document is written next to the target first and moved into place
+    when complete, so a half written export is never picked up. Runs in the
+    executor.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.part")
+    try:
+        with partial.open("w", encoding="utf-8") as file:
+            for batch in batched(chunks, CHUNK_FIXES):
+                file.write("".join(batch))
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
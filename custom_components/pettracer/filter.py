@@ -0,0 +1,181 @@
+"""GPS jitter filter for petTracer collar positions."""
+
+from __future__ import annotations
+
+import math
+
+from homeassistant.util.location import distance
+
+# How fast the true position of a resting collar is assumed to wander, in
+# m²/s. Kept small so jitter averages out, real moves are caught below.
+PROCESS_NOISE = 0.1
+
+# Fixes with fewer satellites or a weaker cellular signal than this are
+# trusted less than their reported accuracy suggests
+MIN_SATELLITES = 5
+WEAK_RSSI = -100
+
+# Fastest plausible pet, in m/s (about 50 km/h). Fixes implying more, beyond
+# the uncertainty of both positions, are rejected as outliers.
+MAX_PLAUSIBLE_SPEED = 14
+
+# A fix further than this many standard deviations from the estimate is a
+# real move, the filter jumps to it instead of averaging it in
+MOVE_SIGMAS = 2
+
+# After this many rejected fixes in a row that agree with each other the
+# collar most likely really moved (a car ride), so the filter starts over
+# from the latest fix. Outliers scattered in all directions stay rejected.
+MAX_REJECTS = 3
+
+
+class PositionFilter:
+    """Kalman filter with an outlier gate for the fixes of one collar.
+
+    The position is modelled as a slow random walk with the same uncertainty
+    in both directions, so a single variance is enough and every fix costs a
+    handful of float operations. Fixes close to the estimate are averaged
+    in, fixes clearly away from it are a move and taken as they are, and
+    fixes implying an impossible speed are dropped. The published position
+    only changes once the estimate leaves the accuracy radius around it, so
+    a resting collar keeps one position instead of a new one for every fix.
+    """
+
+    __slots__ = (
+        "_latitude",
+        "_longitude",
+        "_rejected",
+        "_rejects",
+        "_seen",
+        "_time",
+        "_variance",
+        "accuracy",
+        "latitude",
+        "longitude",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty filter."""
+        self._time: float | None = None
+        self._latitude = 0.0
+        self._longitude = 0.0
+        self._variance = 0.0
+        # Time of the latest fix added, whether it was accepted or not
+        self._seen: float | None = None
+        # Latest rejected fix as time, latitude, longitude and variance, and
+        # how many rejected fixes in a row agree with it
+        self._rejected: tuple[float, float, float, float] | None = None
+        self._rejects = 0
+        # Position shown to the user and its accuracy in meters
+        self.latitude: float | None = None
+        self.longitude: float | None = None
+        self.accuracy = 0
+
+    def update(
+        self,
+        time: float,
+        latitude: float,
+        longitude: float,
+        accuracy: float,
+        satellites: int | None,
+        rssi: int | None,
+    ) -> bool:
+        """Add a fix, return False if it was rejected as an outlier."""
+        if self._seen is not None and time <= self._seen:
+            # Seen before, the latest fix is added on every refresh. A fix
+            # rejected once stays rejected instead of counting again.
+            return self._rejected is None or time != self._rejected[0]
+        self._seen = time
+
+        measurement = _measurement_variance(accuracy, satellites, rssi)
+        if self._time is None:
+            self._reset(time, latitude, longitude, measurement)
+            return True
+
+        elapsed = time - self._time
+        predicted = self._variance + PROCESS_NOISE * elapsed
+        residual = (
+            distance(self._latitude, self._longitude, latitude, longitude) or 0
+        )
+        spread = math.sqrt(predicted + measurement)
+        if residual > MOVE_SIGMAS * spread + MAX_PLAUSIBLE_SPEED * elapsed:
+            if _plausible(self._rejected, time, latitude, longitude, measurement):
+                self._rejects += 1
+            else:
+                # Somewhere else than the outliers before, count from here
+                self._rejects = 1
+            self._rejected = (time, latitude, longitude, measurement)
+            if self._rejects < MAX_REJECTS:
+                return False
+            self._reset(time, latitude, longitude, measurement)
+            return True
+        if residual > MOVE_SIGMAS * spread:
+            self._reset(time, latitude, longitude, measurement)
+            return True
+
+        self._rejected = None
+        self._rejects = 0
+        gain = predicted / (predicted + measurement)
+        self._latitude += gain * (latitude - self._latitude)
+        self._longitude += gain * (longitude - self._longitude)
+        self._variance = (1 - gain) * predicted
+        self._time = time
+
+        # Only publish a move that is larger than the uncertainty, either of
+        # the estimate or of the position published before
+        uncertainty = max(math.sqrt(self._variance), self.accuracy)
+        moved = distance(
+            self.latitude, self.longitude, self._latitude, self._longitude
+        )
+        if moved is not None and moved > uncertainty:
+            self._publish()
+        return True
+
+    def _reset(
+        self, time: float, latitude: float, longitude: float, variance: float
+    ) -> None:
+        """Start over from a single fix."""
+        self._time = time
+        self._latitude = latitude
+        self._longitude = longitude
+        self._variance = variance
+        self._rejected = None
+        self._rejects = 0
+        self._publish()
+
+    def _publish(self) -> None:
+        """Show the current estimate."""
+        self.latitude = round(self._latitude, 6)
+        self.longitude = round(self._longitude, 6)
+        self.accuracy = max(round(math.sqrt(self._variance)), 1)
+
+
+def _plausible(
+    fix: tuple[float, float, float, float] | None,
+    time: float,
+    latitude: float,
+    longitude: float,
+    variance: float,
+) -> bool:
+    """Return whether a pet could have got from a fix to the given position."""
+    if fix is None:
+        return False
+    fix_time, fix_latitude, fix_longitude, fix_variance = fix
+    gap = distance(fix_latitude, fix_longitude, latitude, longitude) or 0
+    return gap <= (
+        MOVE_SIGMAS * math.sqrt(fix_variance + variance)
+        + MAX_PLAUSIBLE_SPEED * (time - fix_time)
+    )
+
+
+def _measurement_variance(
+    accuracy: float, satellites: int | None, rssi: int | None
+) -> float:
+    """Return the variance in m² of a fix from its quality indicators."""
+    sigma = max(accuracy, 1)
+    if satellites is not None and satellites < MIN_SATELLITES:
+        sigma *= 2
+    if rssi is not None and rssi < WEAK_RSSI:
+        # Poor reception, the collar is probably indoors or covered
+        sigma *= 1.5
+    return sigma**2
@@ -0,0 +1,210 @@
+"""Polygon geofences for petTracer collars."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Grid cells are never smaller than this (degrees, about 50 m of latitude)
+MIN_CELL_SIZE = 0.0005
+
+# Zones covering more grid cells than this are checked on every lookup
+# instead, so one huge zone cannot blow up the grid
+MAX_CELLS_PER_ZONE = 64
+
+Ring = tuple[tuple[float, float], ...]
+
+
+class Geofence:
+    """A named polygon, optionally with holes, in (longitude, latitude)."""
+
+    __slots__ = ("area", "bbox", "name", "polygons")
+
+    def __init__(self, name: str, polygons: list[list[Ring]]) -> None:
+        """Initialize the geofence from one or more polygons."""
+        self.name = name
+        # Each polygon is an outer ring followed by its holes
+        self.polygons = polygons
+        points = [point for polygon in polygons for point in polygon[0]]
+        self.bbox = (
+            min(lon for lon, _ in points),
+            min(lat for _, lat in points),
+            max(lon for lon, _ in points),
+            max(lat for _, lat in points),
+        )
+        # Planar area in square degrees, only used to rank nested zones
+        self.area = sum(
+            abs(_ring_area(polygon[0]))
+            - sum(abs(_ring_area(hole)) for hole in polygon[1:])
+            for polygon in polygons
+        )
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        """Return whether the point lies inside the geofence."""
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        if not (min_lon <= longitude <= max_lon and min_lat <= latitude <= max_lat):
+            return False
+        return any(
+            _in_ring(polygon[0], longitude, latitude)
+            and not any(_in_ring(hole, longitude, latitude) for hole in polygon[1:])
+            for polygon in self.polygons
+        )
+
+
+class GeofenceIndex:
+    """Uniform grid over the bounding boxes of all geofences.
+
+    A lookup only tests the few geofences whose bounding box overlaps the
+    grid cell of the point, so the cost does not grow with the number of
+    zones that are elsewhere.
+    """
+
+    def __init__(self, geofences: list[Geofence]) -> None:
+        """Build the index."""
+        self.geofences = geofences
+        self._grid: dict[tuple[int, int], list[Geofence]] = defaultdict(list)
+        self._large: list[Geofence] = []
+        if not geofences:
+            self.cell_size = MIN_CELL_SIZE
+            return
+
+        # Size cells after a typical zone so most zones span only a few cells
+        extents = sorted(
+            max(fence.bbox[2] - fence.bbox[0], fence.bbox[3] - fence.bbox[1])
+            for fence in geofences
+        )
+        self.cell_size = max(extents[len(extents) // 2], MIN_CELL_SIZE)
+
+        for fence in geofences:
+            min_x, min_y = self._cell(fence.bbox[0], fence.bbox[1])
+            max_x, max_y = self._cell(fence.bbox[2], fence.bbox[3])
+            if (max_x - min_x + 1) * (max_y - min_y + 1) > MAX_CELLS_PER_ZONE:
+                self._large.append(fence)
+                continue
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    self._grid[(x, y)].append(fence)
+
+        # Smallest zone first, so nested zones report the most specific one
+        for fences in self._grid.values():
+            fences.sort(key=lambda fence: fence.area)
+
+    def __len__(self) -> int:
+        """Return the number of geofences."""
+        return len(self.geofences)
+
+    def lookup(self, latitude: float, longitude: float) -> list[Geofence]:
+        """Return the geofences containing the point, smallest first."""
+        fences = [
+            fence
+            for fence in self._grid.get(self._cell(longitude, latitude), ())
+            if fence.contains(latitude, longitude)
+        ]
+        if self._large:
+            fences.extend(
+                fence for fence in self._large if fence.contains(latitude, longitude)
+            )
+            fences.sort(key=lambda fence: fence.area)
+        return fences
+
+    def _cell(self, longitude: float, latitude: float) -> tuple[int, int]:
+        """Return the grid cell of a point."""
+        return (
+            math.floor(longitude / self.cell_size),
+            math.floor(latitude / self.cell_size),
+        )
+
+
+def load_geofences(path: Path) -> list[Geofence]:
+    """Load geofences from a GeoJSON file.
+
+    Polygon and MultiPolygon features are used, the zone name is taken from
+    the ``name`` property. Invalid features are skipped, a document that is
+    not GeoJSON at all raises TypeError. This does blocking I/O.
+    """
+    if not path.is_file():
+        return []
+
+    with path.open(encoding="utf-8") as file:
+        document = json.load(file)
+
+    if not isinstance(document, dict):
+        raise TypeError("expected a GeoJSON object")
+    features = (
+        document.get("features", [])
+        if document.get("type") == "FeatureCollection"
+        else [document]
+    )
+    if not isinstance(features, list):
+        raise TypeError("expected a list of features")
+    geofences = []
+    for number, feature in enumerate(features):
+        if not isinstance(feature, dict):
+            _LOGGER.warning("Skipping geofence %d, it is not a feature", number + 1)
+            continue
+        geometry = feature.get("geometry") or {}
+        properties = feature.get("properties")
+        if not isinstance(properties, dict):
+            properties = {}
+        name = properties.get("name") or feature.get("id") or f"Zone {number + 1}"
+        try:
+            polygons = _parse_geometry(geometry)
+        except (KeyError, TypeError, ValueError, IndexError) as err:
+            _LOGGER.warning("Skipping geofence %s with invalid geometry: %s", name, err)
+            continue
+        if not polygons:
+            _LOGGER.warning("Skipping geofence %s, it is not a polygon", name)
+            continue
+        geofences.append(Geofence(str(name), polygons))
+
+    return geofences
+
+
+def _parse_geometry(geometry: dict[str, Any]) -> list[list[Ring]]:
+    """Return the polygons of a GeoJSON geometry."""
+    if not isinstance(geometry, dict):
+        raise TypeError("the geometry is not an object")
+    if geometry.get("type") == "Polygon":
+        coordinates = [geometry["coordinates"]]
+    elif geometry.get("type") == "MultiPolygon":
+        coordinates = geometry["coordinates"]
+    else:
+        return []
+
+    polygons = []
+    for polygon in coordinates:
+        rings = [
+            tuple((float(point[0]), float(point[1])) for point in ring)
+            for ring in polygon
+        ]
+        if not rings or len(rings[0]) < 3:
+            raise ValueError("a polygon needs at least three points")
+        polygons.append(rings)
+    return polygons
+
+
+def _in_ring(ring: Ring, x: float, y: float) -> bool:
+    """Return whether a point is inside a ring, by ray casting."""
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _ring_area(ring: Ring) -> float:
+    """Return the signed planar area of a ring."""
+    area = 0.0
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        area += x1 * y2 - x2 * y1
+        x1, y1 = x2, y2
+    return area / 2
@@ -0,0 +1,227 @@
+"""Bounded in-memory position history for petTracer collars."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from typing import NamedTuple
+
+# Sentinels for missing integer values, arrays cannot hold None
+_NO_ACC = -1
+_NO_SAT = -1
+_NO_RSSI = -32768
+
+
+class Fix(NamedTuple):
+    """A single position fix."""
+
+    time: float
+    latitude: float
+    longitude: float
+    accuracy: int | None
+    satellites: int | None
+    rssi: int | None
+
+
+class PositionHistory:
+    """Ring buffer of position fixes stored column by column.
+
+    Each column is a typed ``array`` so a fix costs 31 bytes instead of a
+    few hundred for a Python object. Fixes are kept in chronological order
+    from ``_start`` on, wrapping around the end of the columns, which allows
+    time range lookups by binary search. Evicting fixes only moves the start,
+    so the slots are reused by later fixes. Times are seconds since the
+    epoch.
+    """
+
+    __slots__ = (
+        "_acc",
+        "_count",
+        "_lat",
+        "_lon",
+        "_rssi",
+        "_sat",
+        "_start",
+        "_time",
+        "max_age",
+        "maxlen",
+    )
+
+    def __init__(self, maxlen: int, max_age: float | None = None) -> None:
+        """Initialize an empty history holding at most ``maxlen`` fixes."""
+        self.maxlen = maxlen
+        self.max_age = max_age
+        self._start = 0
+        self._count = 0
+        self._time = array("d")
+        self._lat = array("d")
+        self._lon = array("d")
+        self._acc = array("i")
+        self._sat = array("b")
+        self._rssi = array("h")
+
+    def __len__(self) -> int:
+        """Return the number of stored fixes."""
+        return self._count
+
+    @property
+    def latest_time(self) -> float | None:
+        """Return the time of the newest fix."""
+        if not self._count:
+            return None
+        return self._time[(self._start + self._count - 1) % len(self._time)]
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the stored columns."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (
+                self._time,
+                self._lat,
+                self._lon,
+                self._acc,
+                self._sat,
+                self._rssi,
+            )
+        )
+
+    def append(
+        self,
+        time: float,
+        latitude: float,
+        longitude: float,
+        accuracy: int | None = None,
+        satellites: int | None = None,
+        rssi: int | None = None,
+    ) -> bool:
+        """Add a fix, return False if it is not newer than the latest one."""
+        latest = self.latest_time
+        if latest is not None and time <= latest:
+            return False
+
+        values = (
+            time,
+            latitude,
+            longitude,
+            _NO_ACC if accuracy is None else int(accuracy),
+            _NO_SAT if satellites is None else min(int(satellites), 127),
+            _NO_RSSI if rssi is None else int(rssi),
+        )
+        capacity = len(self._time)
+
+        if self._count < capacity:
+            # A slot freed by eviction, right after the newest fix
+            pos = (self._start + self._count) % capacity
+            self._count += 1
+        elif capacity < self.maxlen:
+            if self._start:
+                # Evicted slots are all used up. Bring the oldest fix back to
+                # index 0 and add free slots ahead, so this copy stays rare.
+                self._grow(min(2 * capacity, self.maxlen))
+            pos = self._count
+            self._count += 1
+        else:
+            # Full, overwrite the oldest fix
+            pos = self._start
+            self._start = (self._start + 1) % capacity
+
+        columns = (self._time, self._lat, self._lon, self._acc, self._sat, self._rssi)
+        if pos == len(self._time):
+            for column, value in zip(columns, values, strict=True):
+                column.append(value)
+        else:
+            for column, value in zip(columns, values, strict=True):
+                column[pos] = value
+        return True
+
+    def evict(self, now: float) -> int:
+        """Drop fixes older than ``max_age`` and return how many were dropped.
+
+        Only the start moves, the slots of the dropped fixes are reused.
+        """
+        if self.max_age is None or not self._count:
+            return 0
+
+        keep_from = self._bisect(now - self.max_age)
+        if keep_from == 0:
+            return 0
+
+        self._count -= keep_from
+        self._start = (
+            (self._start + keep_from) % len(self._time) if self._count else 0
+        )
+        return keep_from
+
+    def _grow(self, capacity: int) -> None:
+        """Put the fixes in order from index 0, with free slots up to ``capacity``."""
+        for name in ("_time", "_lat", "_lon", "_acc", "_sat", "_rssi"):
+            column = self._ordered(getattr(self, name))
+            column.extend(array(column.typecode, [0]) * (capacity - len(column)))
+            setattr(self, name, column)
+        self._start = 0
+
+    def _ordered(self, column: array) -> array:
+        """Return the stored part of a column in chronological order."""
+        end = self._start + self._count
+        if end <= len(column):
+            return column[self._start : end]
+        return column[self._start :] + column[: end - len(column)]
+
+    def window(self, start: float, end: float) -> PositionHistory:
+        """Return a copy holding the fixes with ``start <= time <= end``.
+
+        Only the typed columns are copied, so this is cheap even for a month
+        of fixes, and the copy can be read from another thread while this
+        history keeps changing.
+        """
+        first = self._bisect(start)
+        last = self._bisect(end, after=True)
+        copy = PositionHistory(max(last - first, 1), self.max_age)
+        for name in ("_time", "_lat", "_lon", "_acc", "_sat", "_rssi"):
+            setattr(copy, name, self._ordered(getattr(self, name))[first:last])
+        copy._count = max(last - first, 0)
+        return copy
+
+    def query(self, start: float, end: float) -> list[Fix]:
+        """Return the fixes with ``start <= time <= end``."""
+        return list(self.iter_range(start, end))
+
+    def iter_range(self, start: float, end: float) -> Iterator[Fix]:
+        """Yield the fixes with ``start <= time <= end`` oldest first."""
+        for index in range(self._bisect(start), self._count):
+            fix = self._fix(index)
+            if fix.time > end:
+                return
+            yield fix
+
+    def _fix(self, index: int) -> Fix:
+        """Return the fix at a chronological index."""
+        pos = (self._start + index) % len(self._time)
+        acc = self._acc[pos]
+        sat = self._sat[pos]
+        rssi = self._rssi[pos]
+        return Fix(
+            self._time[pos],
+            self._lat[pos],
+            self._lon[pos],
+            None if acc == _NO_ACC else acc,
+            None if sat == _NO_SAT else sat,
+            None if rssi == _NO_RSSI else rssi,
+        )
+
+    def _bisect(self, time: float, after: bool = False) -> int:
+        """Return the chronological index of the first fix at or after ``time``.
+
+        With ``after`` the first fix strictly after ``time``.
+        """
+        capacity = len(self._time)
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            fix_time = self._time[(self._start + mid) % capacity]
+            if fix_time < time or (after and fix_time == time):
+                low = mid + 1
+            else:
+                high = mid
+        return low
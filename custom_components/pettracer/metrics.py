@@ -0,0 +1,201 @@
+"""Performance counters for the petTracer integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+# Upper bounds of the latency buckets, in milliseconds
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Request being measured in the current task, payload sizes are added to it
+# by the trace hooks of the shared session
+_current_request: ContextVar[RequestStats | None] = ContextVar(
+    "pettracer_request", default=None
+)
+
+
+class Histogram:
+    """Latency histogram with fixed buckets."""
+
+    __slots__ = ("buckets", "count", "max", "total")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        # One bucket per bound, plus one for everything slower
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, milliseconds: float) -> None:
+        """Add a sample."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean, None without samples."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """Return the bucket bound below which a share q of samples fall."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets, strict=False):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        buckets = {
+            f"<={bound}": count
+            for bound, count in zip(LATENCY_BUCKETS, self.buckets, strict=False)
+        }
+        buckets[f">{LATENCY_BUCKETS[-1]}"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(mean, 1) if (mean := self.mean) is not None else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max, 1),
+            "buckets": buckets,
+        }
+
+
+class RequestStats:
+    """Counters for one kind of API request."""
+
+    __slots__ = ("bytes", "failures", "latency", "successes")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.latency = Histogram()
+        self.successes = 0
+        self.failures = 0
+        self.bytes = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "bytes_received": self.bytes,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class PetTracerMetrics:
+    """Request, refresh and state write counters of one account."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests: dict[str, RequestStats] = {}
+        self.refresh = Histogram()
+        self.refresh_failures = 0
+        self.last_refresh_ms: float | None = None
+        self.last_success: datetime | None = None
+        self.state_writes = 0
+        self.last_refresh_writes: int | None = None
+        self._pending_writes = 0
+
+    @contextmanager
+    def measure_request(self, endpoint: str) -> Iterator[None]:
+        """Time a request and count its outcome and payload size."""
+        if (stats := self.requests.get(endpoint)) is None:
+            stats = self.requests[endpoint] = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            stats.failures += 1
+            raise
+        else:
+            stats.successes += 1
+        finally:
+            stats.latency.add((time.perf_counter() - started) * 1000)
+            _current_request.reset(token)
+
+    def refresh_started(self) -> None:
+        """Close the state write count of the previous refresh."""
+        if self.refresh.count or self.refresh_failures:
+            self.last_refresh_writes = self._pending_writes
+        self._pending_writes = 0
+
+    def refresh_finished(self, seconds: float, success: bool) -> None:
+        """Record the duration of a refresh."""
+        self.last_refresh_ms = seconds * 1000
+        self.refresh.add(self.last_refresh_ms)
+        if success:
+            self.last_success = datetime.now(UTC)
+        else:
+            self.refresh_failures += 1
+
+    def state_written(self) -> None:
+        """Count an entity state write."""
+        self.state_writes += 1
+        self._pending_writes += 1
+
+    @property
+    def request_failures(self) -> int:
+        """Return the failed requests of all kinds."""
+        return sum(stats.failures for stats in self.requests.values())
+
+    @property
+    def request_latency(self) -> float | None:
+        """Return the mean latency of all requests in milliseconds."""
+        count = sum(stats.latency.count for stats in self.requests.values())
+        if not count:
+            return None
+        return sum(stats.latency.total for stats in self.requests.values()) / count
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all counters for diagnostics."""
+        return {
+            "requests": {
+                endpoint: stats.as_dict() for endpoint, stats in self.requests.items()
+            },
+            "refresh": {
+                **self.refresh.as_dict(),
+                "failures": self.refresh_failures,
+                "last_ms": self.last_refresh_ms,
+                "last_success": self.last_success.isoformat()
+                if self.last_success
+                else None,
+            },
+            "state_writes": {
+                "total": self.state_writes,
+                "last_refresh": self.last_refresh_writes,
+            },
+        }
+
+
+def request_trace_config() -> aiohttp.TraceConfig:
+    """Return trace hooks that add response sizes to the measured request."""
+
+    async def on_response_chunk_received(
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceResponseChunkReceivedParams,
+    ) -> None:
+        if (stats := _current_request.get()) is not None:
+            stats.bytes += len(params.chunk)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    return trace_config
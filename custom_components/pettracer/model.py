@@ -0,0 +1,131 @@
+"""Per-refresh view of a petTracer collar shared by all its entities."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+
+from homeassistant.util import dt as dt_util
+from pettracer import Device
+
+from .battery import DrainEstimator, battery_percentage
+from .filter import PositionFilter
+from .movement import MovementTracker
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACKING_MODES = {1: "Fast", 2: "Normal", 3: "Slow"}
+
+
+@dataclass(frozen=True, slots=True)
+class CollarView:
+    """Values shown by the entities of one collar.
+
+    Built once per refresh, so entities only read attributes instead of
+    converting the raw device on every state write. Two views compare equal
+    when nothing visible changed.
+    """
+
+    name: str
+    latitude: float | None
+    longitude: float | None
+    accuracy: int
+    last_update: datetime | None
+    satellites: int | None
+    signal_strength: int | None
+    battery_level: int | None
+    battery_voltage: int | None
+    battery_remaining: float | None
+    last_contact: datetime | None
+    status: int | None
+    mode: int | None
+    charging_status: str | None
+    tracking_mode: str | None
+    search_status: str | None
+    distance: float | None
+    speed: float | None
+    max_speed: float | None
+    time_away: int | None
+    geofence: str | None
+
+
+def build_view(
+    device_id: str,
+    device: Device,
+    position: PositionFilter | None,
+    movement: MovementTracker | None,
+    battery: DrainEstimator | None,
+    zones: list[str] | None,
+) -> CollarView:
+    """Convert a raw device and the derived state of a collar into a view."""
+    pos = device.lastPos
+    if position is not None and position.latitude is not None:
+        # Filtered position, steady while the collar rests
+        latitude, longitude, accuracy = (
+            position.latitude,
+            position.longitude,
+            position.accuracy,
+        )
+    else:
+        latitude = pos.posLat if pos else None
+        longitude = pos.posLong if pos else None
+        accuracy = pos.acc if pos and pos.acc else 0
+    return CollarView(
+        name=device.details.name if device.details else f"Pet Tracker {device_id}",
+        latitude=latitude,
+        longitude=longitude,
+        accuracy=accuracy,
+        last_update=pos.timeMeasure if pos else None,
+        satellites=pos.sat if pos else None,
+        signal_strength=pos.rssi if pos else None,
+        battery_level=battery_percentage(device.bat) if device.bat else None,
+        battery_voltage=device.bat,
+        battery_remaining=(
+            round(remaining, 1)
+            if battery and (remaining := battery.time_remaining) is not None
+            else None
+        ),
+        last_contact=_parse_last_contact(device.lastContact),
+        status=device.status,
+        mode=device.mode,
+        charging_status=(
+            None
+            if device.chg is None
+            else "Charging"
+            if device.chg == 1
+            else "Not charging"
+        ),
+        tracking_mode=(
+            None
+            if device.modeSet is None
+            else TRACKING_MODES.get(device.modeSet, "Unknown")
+        ),
+        search_status=(
+            None if device.search is None else "On" if device.search else "Off"
+        ),
+        distance=round(movement.distance / 1000, 3) if movement else None,
+        speed=(
+            round(movement.speed, 1)
+            if movement and movement.speed is not None
+            else None
+        ),
+        max_speed=round(movement.max_speed, 1) if movement else None,
+        time_away=round(movement.time_away / 60) if movement else None,
+        # Zones are sorted smallest first, report the most specific one
+        geofence=(zones[0] if zones else "none") if zones is not None else None,
+    )
+
+
+def _parse_last_contact(value: datetime | str | None) -> datetime | None:
+    """Return lastContact as a datetime, older clients returned a string."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return dt_util.parse_datetime(value)
+        except (ValueError, TypeError):
+            _LOGGER.warning("Failed to parse lastContact timestamp: %s", value)
+    return None
@@ -0,0 +1,131 @@
+"""Running movement statistics for petTracer collars."""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from homeassistant.util.location import distance
+
+from .const import MAX_FIX_GAP
+
+# A move only counts once it is this many times the combined accuracy of the
+# two fixes. Two fixes of a resting collar are each off by up to their
+# accuracy, so their distance often exceeds either accuracy alone.
+MOVE_SIGMAS = 3
+
+# Fixes without an accuracy, or claiming a better one, are taken to be this
+# accurate in meters
+MIN_ACCURACY = 5
+
+
+class MovementTracker:
+    """Accumulate distance, speed and time away from home one fix at a time.
+
+    Every fix is folded into running totals, so the cost per fix is
+    constant and no position history is needed. A move only counts once it
+    clearly exceeds the combined accuracy of both fixes. Smaller moves leave
+    the anchor where it is, which keeps a resting collar from building up
+    distance out of GPS jitter.
+    """
+
+    __slots__ = (
+        "_anchor",
+        "_last_away",
+        "_last_time",
+        "distance",
+        "max_speed",
+        "period",
+        "speed",
+        "time_away",
+    )
+
+    def __init__(self, period: str) -> None:
+        """Initialize empty statistics for a reset period."""
+        self.period = period
+        self.distance = 0.0
+        self.speed: float | None = None
+        self.max_speed = 0.0
+        self.time_away = 0.0
+        # Last fix that counted as a move, as (time, latitude, longitude, accuracy)
+        self._anchor: tuple[float, float, float, float] | None = None
+        self._last_time: float | None = None
+        self._last_away: bool | None = None
+
+    def add_fix(
+        self,
+        time: float,
+        latitude: float,
+        longitude: float,
+        accuracy: float,
+        away: bool | None,
+        period: str,
+    ) -> bool:
+        """Fold a fix into the statistics, return False if it was ignored."""
+        if self._last_time is not None and time <= self._last_time:
+            return False
+
+        if period != self.period:
+            self.reset(period)
+
+        # Time away is attributed to where the collar was at the previous fix
+        if self._last_away and time - self._last_time <= MAX_FIX_GAP:
+            self.time_away += time - self._last_time
+        self._last_time = time
+        self._last_away = away
+
+        accuracy = max(accuracy, MIN_ACCURACY)
+        if self._anchor is None:
+            self._anchor = (time, latitude, longitude, accuracy)
+            return True
+
+        anchor_time, anchor_lat, anchor_lon, anchor_acc = self._anchor
+        moved = distance(anchor_lat, anchor_lon, latitude, longitude) or 0.0
+        if moved <= MOVE_SIGMAS * math.hypot(accuracy, anchor_acc):
+            # Still at the anchor, only remember that it was seen there
+            self._anchor = (time, anchor_lat, anchor_lon, anchor_acc)
+            self.speed = 0.0
+            return True
+
+        self.distance += moved
+        elapsed = time - anchor_time
+        if elapsed <= MAX_FIX_GAP:
+            self.speed = moved / elapsed * 3.6
+            self.max_speed = max(self.max_speed, self.speed)
+        else:
+            self.speed = None
+        self._anchor = (time, latitude, longitude, accuracy)
+        return True
+
+    def reset(self, period: str) -> None:
+        """Start a new reset period, keeping the last position."""
+        self.period = period
+        self.distance = 0.0
+        self.max_speed = 0.0
+        self.time_away = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the tracker for storage."""
+        return {
+            "period": self.period,
+            "distance": self.distance,
+            "speed": self.speed,
+            "max_speed": self.max_speed,
+            "time_away": self.time_away,
+            "anchor": self._anchor,
+            "last_time": self._last_time,
+            "last_away": self._last_away,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MovementTracker:
+        """Restore a tracker from storage."""
+        tracker = cls(data["period"])
+        tracker.distance = data["distance"]
+        tracker.speed = data["speed"]
+        tracker.max_speed = data["max_speed"]
+        tracker.time_away = data["time_away"]
+        tracker._anchor = tuple(data["anchor"]) if data["anchor"] else None
+        tracker._last_time = data["last_time"]
+        tracker._last_away = data["last_away"]
+        return tracker
@@ -0,0 +1,175 @@
+"""Frequented places of petTracer collars."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import Any
+
+from .const import MAX_FIX_GAP
+
+# Edge length of the grid cells dwell time is counted in, in meters
+CELL_SIZE = 25
+_CELL_LAT = CELL_SIZE / 111_320
+
+# Dwell time loses half of its weight after this long, so places the pet
+# no longer visits fade out of the list
+PLACE_HALF_LIFE = 7 * 24 * 3600
+
+# Cells kept per collar. Once full the least visited quarter is dropped.
+MAX_CELLS = 256
+
+# Weights are stored grown by the decay since the epoch instead of being
+# decayed on every fix. They are scaled back once they grow by this many
+# half-lives, long before a float could overflow.
+_RENORMALIZE_AFTER = 64
+
+
+@dataclass(frozen=True, slots=True)
+class Place:
+    """A frequented place and the recent time spent there."""
+
+    latitude: float
+    longitude: float
+    dwell: float
+    share: float
+
+
+class PlaceTracker:
+    """Decaying dwell time of a collar per grid cell.
+
+    Each fix adds the time since the previous fix to the cell the collar
+    was in, a dictionary lookup and three additions whatever the history.
+    Decay is applied by growing the weight of new dwell time instead of
+    shrinking all cells, so it costs nothing per fix either. The number of
+    cells is bounded, so the tracker can run indefinitely.
+    """
+
+    __slots__ = ("_cells", "_epoch", "_last")
+
+    def __init__(self) -> None:
+        """Initialize without any visits."""
+        # (row, column) -> [weight, weight * latitude, weight * longitude]
+        self._cells: dict[tuple[int, int], list[float]] = {}
+        self._epoch: float | None = None
+        # Previous fix, as (time, latitude, longitude)
+        self._last: tuple[float, float, float] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of cells visited."""
+        return len(self._cells)
+
+    def add_fix(self, time: float, latitude: float, longitude: float) -> bool:
+        """Count the time since the previous fix, return False if ignored."""
+        last = self._last
+        if last is not None and time <= last[0]:
+            return False
+        self._last = (time, latitude, longitude)
+        if last is None or time - last[0] > MAX_FIX_GAP:
+            return True
+
+        # The collar was at the previous fix until this one came in
+        last_time, last_lat, last_lon = last
+        if self._epoch is None:
+            self._epoch = last_time
+        growth = (time - self._epoch) / PLACE_HALF_LIFE
+        if growth > _RENORMALIZE_AFTER:
+            self._renormalize(time)
+            growth = 0.0
+        weight = (time - last_time) * 2**growth
+
+        key = _cell(last_lat, last_lon)
+        if (cell := self._cells.get(key)) is None:
+            if len(self._cells) >= MAX_CELLS:
+                self._prune()
+            cell = self._cells[key] = [0.0, 0.0, 0.0]
+        cell[0] += weight
+        cell[1] += weight * last_lat
+        cell[2] += weight * last_lon
+        return True
+
+    def places(self, count: int, now: float) -> list[Place]:
+        """Return the most frequented places, most visited first.
+
+        A place is a cell together with the neighbouring cells that were not
+        part of a busier place, so a spot on a cell edge is not split up.
+        """
+        if not self._cells or self._epoch is None:
+            return []
+        decay = 2 ** (-(now - self._epoch) / PLACE_HALF_LIFE)
+        total = sum(cell[0] for cell in self._cells.values())
+        remaining = dict(self._cells)
+        places: list[Place] = []
+        for row, column in sorted(
+            self._cells, key=lambda key: self._cells[key][0], reverse=True
+        ):
+            if len(places) == count:
+                break
+            if (row, column) not in remaining:
+                continue
+            weight = lat_sum = lon_sum = 0.0
+            for key in (
+                (row + d_row, column + d_column)
+                for d_row in (-1, 0, 1)
+                for d_column in (-1, 0, 1)
+            ):
+                if (cell := remaining.pop(key, None)) is not None:
+                    weight += cell[0]
+                    lat_sum += cell[1]
+                    lon_sum += cell[2]
+            places.append(
+                Place(
+                    lat_sum / weight,
+                    lon_sum / weight,
+                    weight * decay,
+                    weight / total,
+                )
+            )
+        return places
+
+    def _renormalize(self, time: float) -> None:
+        """Move the epoch to a time, shrinking the stored weights with it."""
+        scale = 2 ** (-(time - self._epoch) / PLACE_HALF_LIFE)
+        for cell in self._cells.values():
+            cell[0] *= scale
+            cell[1] *= scale
+            cell[2] *= scale
+        self._epoch = time
+
+    def _prune(self) -> None:
+        """Drop the least visited quarter of the cells."""
+        for key in sorted(self._cells, key=lambda key: self._cells[key][0])[
+            : MAX_CELLS // 4
+        ]:
+            del self._cells[key]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the tracker for storage."""
+        return {
+            "epoch": self._epoch,
+            "last": self._last,
+            "cells": [[*key, *cell] for key, cell in self._cells.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PlaceTracker:
+        """Restore a tracker from storage."""
+        tracker = cls()
+        tracker._epoch = data["epoch"]
+        tracker._last = tuple(data["last"]) if data["last"] else None
+        tracker._cells = {
+            (row, column): [weight, lat_sum, lon_sum]
+            for row, column, weight, lat_sum, lon_sum in data["cells"]
+        }
+        return tracker
+
+
+def _cell(latitude: float, longitude: float) -> tuple[int, int]:
+    """Return the grid cell of a position.
+
+    Cells are narrower in degrees of longitude away from the equator, so
+    they stay about square on the ground.
+    """
+    row = math.floor(latitude / _CELL_LAT)
+    width = _CELL_LAT / max(math.cos(math.radians(row * _CELL_LAT)), 0.01)
+    return row, math.floor(longitude / width)
@@ -0,0 +1,219 @@
+"""Adaptive polling interval for the petTracer integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.util import dt as dt_util
+from homeassistant.util.location import distance
+from pettracer import Device
+
+from .const import (
+    CADENCE_MARGIN,
+    CADENCE_MAX,
+    CADENCE_MIN,
+    CADENCE_SMOOTHING,
+    MIN_POLL_SPACING,
+    MOVEMENT_THRESHOLD,
+    POLL_INTERVAL_CHARGING,
+    POLL_INTERVAL_FAST,
+    POLL_INTERVAL_NORMAL,
+    POLL_INTERVAL_SLOW_MODE,
+    POLL_INTERVAL_STATIONARY,
+    STATIONARY_AFTER,
+    TRACKING_MODE_SLOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _CollarMotion:
+    """Last known position of a collar and when it last moved."""
+
+    latitude: float
+    longitude: float
+    last_moved: datetime
+
+
+@dataclass(slots=True)
+class _CollarCadence:
+    """How often a collar reports and how long its fixes take to upload."""
+
+    last_fix: datetime
+    delay: float
+    mode: int | None
+    interval: float | None = None
+
+    @property
+    def expected(self) -> datetime | None:
+        """Return when the next fix should be available, None if unknown."""
+        if self.interval is None:
+            return None
+        return self.last_fix + timedelta(seconds=self.interval + self.delay)
+
+
+class AdaptivePolling:
+    """Pick a poll interval per collar from what the last refresh reported.
+
+    Collars in live tracking or on the move are polled fast. Collars that
+    are charging, in "Slow" tracking mode or have not moved for a while are
+    polled less often. Since one request returns every collar of the
+    account, the coordinator polls at the shortest of these intervals.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the polling policy."""
+        self._motion: dict[str, _CollarMotion] = {}
+        self._cadences: dict[str, _CollarCadence] = {}
+        self.intervals: dict[str, timedelta] = {}
+
+    def update(self, data: dict[str, Device]) -> timedelta:
+        """Update the per-collar intervals and return the effective one."""
+        now = dt_util.utcnow()
+        self.intervals = {
+            device_id: self._interval_for(device_id, device, now)
+            for device_id, device in data.items()
+        }
+        for device_id, device in data.items():
+            self._update_cadence(device_id, device)
+        # Forget collars that are no longer part of the account
+        for device_id in self._motion.keys() - data.keys():
+            del self._motion[device_id]
+        for device_id in self._cadences.keys() - data.keys():
+            del self._cadences[device_id]
+
+        return min(self.intervals.values(), default=POLL_INTERVAL_NORMAL)
+
+    @property
+    def cadences(self) -> dict[str, dict[str, float | None]]:
+        """Return the learned cadence and upload delay of each collar."""
+        return {
+            device_id: {"interval": cadence.interval, "delay": cadence.delay}
+            for device_id, cadence in self._cadences.items()
+        }
+
+    def next_poll_delay(self, now: datetime, interval: timedelta) -> timedelta | None:
+        """Return when to poll to fetch the next fixes as soon as they are in.
+
+        Polls stay between MIN_POLL_SPACING of the interval and the interval
+        itself, and within that land just after the last fix expected, so a
+        single poll picks up as many collars as possible. When no collar
+        reports within the interval, the poll waits for the next fix, at
+        most a second interval. None while the cadence of a collar is still
+        unknown or its fix is overdue, the plain interval applies then.
+        """
+        expected: list[datetime] = []
+        for cadence in self._cadences.values():
+            if (fix := cadence.expected) is None:
+                return None
+            if fix + CADENCE_MARGIN < now:
+                if now - fix < timedelta(seconds=3 * cadence.interval):
+                    # Late, keep polling at the interval until it shows up
+                    return None
+                # Not reporting at all, no point in waiting for it
+                continue
+            expected.append(fix + CADENCE_MARGIN)
+        if not expected:
+            return None
+
+        earliest = now + interval * MIN_POLL_SPACING
+        # A fix a little after the interval is worth the wait, the collar that
+        # the last poll followed comes back at about one interval plus jitter
+        latest = now + interval + CADENCE_MARGIN
+        if due := [fix for fix in expected if earliest <= fix <= latest]:
+            return max(due) - now
+        if (upcoming := min(expected)) > latest:
+            # Nothing new before the interval is up
+            return min(upcoming, latest + interval) - now
+        return earliest - now
+
+    def _update_cadence(self, device_id: str, device: Device) -> None:
+        """Learn how often a collar reports from its successive fixes."""
+        pos = device.lastPos
+        if not pos or pos.timeMeasure is None:
+            return
+        delay = _upload_delay(pos.timeMeasure, pos.timeDb, device.lastContact)
+        cadence = self._cadences.get(device_id)
+        if cadence is None or cadence.mode != device.modeSet:
+            # Collars report at another rate in another tracking mode
+            self._cadences[device_id] = _CollarCadence(
+                pos.timeMeasure, delay, device.modeSet
+            )
+            return
+
+        gap = (pos.timeMeasure - cadence.last_fix).total_seconds()
+        if gap <= 0:
+            return
+        cadence.last_fix = pos.timeMeasure
+        cadence.delay += CADENCE_SMOOTHING * (delay - cadence.delay)
+        if cadence.interval is not None and gap > 1.5 * cadence.interval:
+            # Fixes in between were missed, count the gap in whole steps
+            steps = round(gap / cadence.interval)
+            if abs(gap / steps - cadence.interval) <= 0.25 * cadence.interval:
+                gap /= steps
+        if not CADENCE_MIN.total_seconds() <= gap <= CADENCE_MAX.total_seconds():
+            return
+        if cadence.interval is None:
+            cadence.interval = gap
+        else:
+            cadence.interval += CADENCE_SMOOTHING * (gap - cadence.interval)
+
+    def _interval_for(
+        self, device_id: str, device: Device, now: datetime
+    ) -> timedelta:
+        """Return the interval wanted by a single collar."""
+        moving = self._update_motion(device_id, device, now)
+
+        if device.search:
+            return POLL_INTERVAL_FAST
+        if moving:
+            return POLL_INTERVAL_FAST
+        if device.chg == 1:
+            return POLL_INTERVAL_CHARGING
+        if device.modeSet == TRACKING_MODE_SLOW:
+            return POLL_INTERVAL_SLOW_MODE
+
+        motion = self._motion.get(device_id)
+        if motion and now - motion.last_moved >= STATIONARY_AFTER:
+            return POLL_INTERVAL_STATIONARY
+        return POLL_INTERVAL_NORMAL
+
+    def _update_motion(self, device_id: str, device: Device, now: datetime) -> bool:
+        """Track the collar position and return whether it moved."""
+        pos = device.lastPos
+        if not pos or pos.posLat is None or pos.posLong is None:
+            return False
+
+        motion = self._motion.get(device_id)
+        if motion is None:
+            # Nothing to compare against yet, assume the collar just moved
+            self._motion[device_id] = _CollarMotion(pos.posLat, pos.posLong, now)
+            return False
+
+        moved = distance(
+            motion.latitude, motion.longitude, pos.posLat, pos.posLong
+        )
+        if moved is None or moved <= max(MOVEMENT_THRESHOLD, pos.acc or 0):
+            return False
+
+        _LOGGER.debug("Collar %s moved %.0f m since the last poll", device_id, moved)
+        motion.latitude = pos.posLat
+        motion.longitude = pos.posLong
+        motion.last_moved = now
+        return True
+
+
+def _upload_delay(
+    measured: datetime, stored: datetime | None, last_contact: datetime | None
+) -> float:
+    """Return the seconds between taking a fix and it being in the cloud."""
+    for available in (stored, last_contact):
+        if (
+            isinstance(available, datetime)
+            and timedelta(0) <= available - measured <= CADENCE_MAX
+        ):
+            return (available - measured).total_seconds()
+    return 0.0
@@ -0,0 +1,79 @@
+"""Polling scheduler shared by all petTracer accounts."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+
+import aiohttp
+
+from .api import TokenBucket
+from .capture import TrafficCapture
+from .const import (
+    MAX_CONCURRENT_REQUESTS,
+    MAX_CONNECTIONS,
+    MIN_POLL_SPACING,
+    REQUEST_BURST,
+    REQUEST_RATE,
+)
+from .metrics import request_trace_config
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """Spread the polls of all petTracer accounts evenly over time.
+
+    Each account owns a slot. Polls fire at the phase of that slot within
+    the poll interval, so two accounts polling every minute start 30 seconds
+    apart instead of together. All accounts share one bounded connection
+    pool, a semaphore caps the requests in flight across accounts and a
+    token bucket limits their rate.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler and its shared session."""
+        # Raw traffic of all accounts, recorded on request
+        self.capture = TrafficCapture()
+        # Our own session, HA's managed session has incompatible settings
+        # for the petTracer API
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS),
+            trace_configs=[request_trace_config(), self.capture.trace_config()],
+        )
+        self.requests = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self.rate_limit = TokenBucket(REQUEST_RATE, REQUEST_BURST)
+        self._slots: list[str] = []
+
+    def __len__(self) -> int:
+        """Return the number of registered accounts."""
+        return len(self._slots)
+
+    def register(self, entry_id: str) -> None:
+        """Give an account a slot, the slots of the others move up."""
+        if entry_id not in self._slots:
+            self._slots.append(entry_id)
+
+    def unregister(self, entry_id: str) -> None:
+        """Free the slot of an account."""
+        if entry_id in self._slots:
+            self._slots.remove(entry_id)
+
+    def next_poll(self, entry_id: str, now: float, interval: float) -> float:
+        """Return the loop time of the next poll of an account.
+
+        This is the first moment in the slot of the account that is at least
+        part of an interval away, so a poll that ran on time is followed by
+        one exactly an interval later.
+        """
+        slot = self._slots.index(entry_id) if entry_id in self._slots else 0
+        phase = interval * slot / max(len(self._slots), 1)
+        earliest = now + interval * MIN_POLL_SPACING
+        return phase + math.ceil((earliest - phase) / interval) * interval
+
+    async def async_close(self) -> None:
+        """Close the shared session."""
+        _LOGGER.debug("Closing the shared petTracer session")
+        await self.capture.async_stop()
+        await self.session.close()
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime
 import logging
 from typing import Any
@@ -16,67 +18,219 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
     UnitOfElectricPotential,
+    UnitOfLength,
+    UnitOfSpeed,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import dt as dt_util
 
 from . import PetTracerDataUpdateCoordinator
 from .const import DOMAIN
+from .entity import PetTracerEntity
+from .model import CollarView
 
 _LOGGER = logging.getLogger(__name__)
 
-SENSOR_TYPES: tuple[SensorEntityDescription, ...] = (
-    SensorEntityDescription(
+
+@dataclass(frozen=True, kw_only=True)
+class PetTracerSensorEntityDescription(SensorEntityDescription):
+    """Describes a petTracer sensor."""
+
+    value_fn: Callable[[CollarView], StateType | datetime]
+    exists_fn: Callable[[PetTracerDataUpdateCoordinator], bool] = lambda _: True
+
+
+@dataclass(frozen=True, kw_only=True)
+class PetTracerMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a petTracer account performance sensor."""
+
+    value_fn: Callable[[PetTracerDataUpdateCoordinator], StateType | datetime]
+
+
+SENSOR_TYPES: tuple[PetTracerSensorEntityDescription, ...] = (
+    PetTracerSensorEntityDescription(
         key="battery_level",
         name="Battery level",
         device_class=SensorDeviceClass.BATTERY,
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda view: view.battery_level,
     ),
-    SensorEntityDescription(
+    PetTracerSensorEntityDescription(
         key="battery_voltage",
         name="Battery voltage",
         device_class=SensorDeviceClass.VOLTAGE,
         native_unit_of_measurement=UnitOfElectricPotential.MILLIVOLT,
         state_class=SensorStateClass.MEASUREMENT,
         entity_registry_enabled_default=False,
+        value_fn=lambda view: view.battery_voltage,
+    ),
+    PetTracerSensorEntityDescription(
+        key="battery_remaining",
+        name="Battery time remaining",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        icon="mdi:battery-clock-outline",
+        value_fn=lambda view: view.battery_remaining,
     ),
-    SensorEntityDescription(
+    PetTracerSensorEntityDescription(
         key="signal_strength",
         name="Signal strength",
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
         state_class=SensorStateClass.MEASUREMENT,
         entity_registry_enabled_default=False,
+        value_fn=lambda view: view.signal_strength,
     ),
-    SensorEntityDescription(
+    PetTracerSensorEntityDescription(
         key="last_contact",
         name="Last contact",
         device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda view: view.last_contact,
+    ),
+    PetTracerSensorEntityDescription(
+        key="last_update",
+        name="Last fix",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default=False,
+        value_fn=lambda view: view.last_update,
     ),
-    SensorEntityDescription(
+    PetTracerSensorEntityDescription(
         key="satellites",
         name="GPS satellites",
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:satellite-variant",
+        value_fn=lambda view: view.satellites,
     ),
-    SensorEntityDescription(
+    PetTracerSensorEntityDescription(
         key="charging_status",
         name="Charging status",
         icon="mdi:battery-charging",
+        value_fn=lambda view: view.charging_status,
     ),
-    SensorEntityDescription(
+    PetTracerSensorEntityDescription(
         key="tracking_mode",
         name="Tracking mode",
         icon="mdi:crosshairs",
+        value_fn=lambda view: view.tracking_mode,
     ),
-    SensorEntityDescription(
+    PetTracerSensorEntityDescription(
         key="search_status",
         name="Live tracking",
         icon="mdi:radar",
+        value_fn=lambda view: view.search_status,
+    ),
+    PetTracerSensorEntityDescription(
+        key="distance",
+        name="Distance travelled",
+        device_class=SensorDeviceClass.DISTANCE,
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        icon="mdi:map-marker-distance",
+        value_fn=lambda view: view.distance,
+    ),
+    PetTracerSensorEntityDescription(
+        key="speed",
+        name="Speed",
+        device_class=SensorDeviceClass.SPEED,
+        native_unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda view: view.speed,
+    ),
+    PetTracerSensorEntityDescription(
+        key="max_speed",
+        name="Max speed",
+        device_class=SensorDeviceClass.SPEED,
+        native_unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda view: view.max_speed,
+    ),
+    PetTracerSensorEntityDescription(
+        key="time_away",
+        name="Time away from home",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:home-export-outline",
+        value_fn=lambda view: view.time_away,
+    ),
+    PetTracerSensorEntityDescription(
+        key="geofence",
+        name="Geofence",
+        icon="mdi:vector-polygon",
+        value_fn=lambda view: view.geofence,
+        # Only useful when polygon zones have been defined
+        exists_fn=lambda coordinator: bool(coordinator.geofences),
+    ),
+)
+
+# Performance of the account as a whole, for troubleshooting
+METRIC_SENSOR_TYPES: tuple[PetTracerMetricSensorEntityDescription, ...] = (
+    PetTracerMetricSensorEntityDescription(
+        key="update_interval",
+        name="Update interval",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        icon="mdi:timer-sync-outline",
+        value_fn=lambda coordinator: (
+            int(coordinator.update_interval.total_seconds())
+            if coordinator.update_interval
+            else None
+        ),
+    ),
+    PetTracerMetricSensorEntityDescription(
+        key="api_latency",
+        name="API latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.metrics.request_latency,
+    ),
+    PetTracerMetricSensorEntityDescription(
+        key="refresh_duration",
+        name="Refresh duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.metrics.last_refresh_ms,
+    ),
+    PetTracerMetricSensorEntityDescription(
+        key="failed_requests",
+        name="Failed requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:cloud-alert-outline",
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.metrics.request_failures,
+    ),
+    PetTracerMetricSensorEntityDescription(
+        key="state_writes",
+        name="State writes per refresh",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:database-edit-outline",
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.metrics.last_refresh_writes,
+    ),
+    PetTracerMetricSensorEntityDescription(
+        key="last_success",
+        name="Last successful update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.metrics.last_success,
     ),
 )
 
@@ -88,123 +242,123 @@ async def async_setup_entry(
 ) -> None:
     """Set up petTracer sensor entities from config entry."""
     coordinator: PetTracerDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    added: set[str] = set()
 
-    entities = []
-    if coordinator.data:
-        for device_id, device in coordinator.data.items():
-            device_name = (
-                device.details.name if device.details else f"Pet Tracker {device_id}"
-            )
+    @callback
+    def _async_add_new_collars() -> None:
+        """Add sensors for collars that are not set up yet."""
+        # Collars that left the account are removed with their device
+        added.intersection_update(coordinator.collar_ids)
+        entities = []
+        for device_id, view in coordinator.views.items():
+            if device_id in added:
+                continue
+            added.add(device_id)
             for description in SENSOR_TYPES:
+                if not description.exists_fn(coordinator):
+                    continue
                 entities.append(
                     PetTracerSensor(
                         coordinator,
                         device_id,
-                        device_name,
+                        view.name,
                         description,
                     )
                 )
+        if entities:
+            async_add_entities(entities)
 
-    async_add_entities(entities)
+    _async_add_new_collars()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_collars))
 
+    async_add_entities(
+        PetTracerMetricSensor(coordinator, description)
+        for description in METRIC_SENSOR_TYPES
+    )
 
-class PetTracerSensor(CoordinatorEntity, SensorEntity):
+
+class PetTracerSensor(PetTracerEntity, SensorEntity):
     """Representation of a petTracer sensor."""
 
-    _attr_has_entity_name = True
+    entity_description: PetTracerSensorEntityDescription
 
     def __init__(
         self,
         coordinator: PetTracerDataUpdateCoordinator,
         device_id: str,
         device_name: str,
-        description: SensorEntityDescription,
+        description: PetTracerSensorEntityDescription,
     ) -> None:
         """Initialize the petTracer sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, device_id, device_name)
         self.entity_description = description
-        self._device_id = device_id
-        self._device_name = device_name
         self._attr_unique_id = f"{DOMAIN}_{device_id}_{description.key}"
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information about this sensor."""
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": self._device_name,
-            "manufacturer": "petTracer",
-            "model": "Pet Collar",
-        }
-
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return (
-            super().available
-            and self.coordinator.data is not None
-            and self._device_id in self.coordinator.data
-        )
+        return super().available and self._device_id in self.coordinator.views
+
+    def _entity_state(self) -> tuple[Any, ...]:
+        """Return everything the sensor shows."""
+        return (self.available, self.native_value)
 
     @property
-    def native_value(self) -> int | float | datetime | None:
+    def native_value(self) -> StateType | datetime:
         """Return the state of the sensor."""
-        if not self.coordinator.data or self._device_id not in self.coordinator.data:
+        if (view := self.coordinator.views.get(self._device_id)) is None:
             return None
+        return self.entity_description.value_fn(view)
 
-        device = self.coordinator.data[self._device_id]
-
-        if self.entity_description.key == "battery_level":
-            # Convert battery voltage (mV) to approximate percentage
-            # Typical range: 3300mV (empty) to 4200mV (full)
-            if device.bat:
-                return min(100, max(0, int((device.bat - 3300) / 9)))
-            return None
 
-        if self.entity_description.key == "battery_voltage":
-            return device.bat
+class PetTracerMetricSensor(
+    CoordinatorEntity[PetTracerDataUpdateCoordinator], SensorEntity
+):
+    """Performance sensor of a petTracer account."""
 
-        if self.entity_description.key == "signal_strength":
-            if device.lastPos and device.lastPos.rssi is not None:
-                return device.lastPos.rssi
-            return None
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-        if self.entity_description.key == "last_contact":
-            if device.lastContact:
-                # If lastContact is a string, try to parse it
-                if isinstance(device.lastContact, str):
-                    try:
-                        return dt_util.parse_datetime(device.lastContact)
-                    except (ValueError, TypeError):
-                        _LOGGER.warning(
-                            "Failed to parse lastContact timestamp: %s",
-                            device.lastContact,
-                        )
-                        return None
-                # If it's already a datetime object
-                if isinstance(device.lastContact, datetime):
-                    return device.lastContact
-            return None
+    entity_description: PetTracerMetricSensorEntityDescription
 
-        if self.entity_description.key == "satellites":
-            if device.lastPos and device.lastPos.sat is not None:
-                return device.lastPos.sat
-            return None
+    def __init__(
+        self,
+        coordinator: PetTracerDataUpdateCoordinator,
+        description: PetTracerMetricSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        entry = coordinator.entry
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=f"petTracer {entry.title}",
+            manufacturer="petTracer",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+        self._last_value: StateType | datetime = None
 
-        if self.entity_description.key == "charging_status":
-            if device.chg is not None:
-                return "Charging" if device.chg == 1 else "Not charging"
-            return None
+    async def async_added_to_hass(self) -> None:
+        """Remember the value the sensor was added with."""
+        await super().async_added_to_hass()
+        self._last_value = self.native_value
 
-        if self.entity_description.key == "tracking_mode":
-            if device.modeSet is not None:
-                modes = {1: "Fast", 2: "Normal", 3: "Slow"}
-                return modes.get(device.modeSet, "Unknown")
-            return None
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the value changed."""
+        value = self.native_value
+        if value == self._last_value:
+            return
+        self._last_value = value
+        super()._handle_coordinator_update()
 
-        if self.entity_description.key == "search_status":
-            if device.search is not None:
-                return "On" if device.search else "Off"
-            return None
+    @property
+    def available(self) -> bool:
+        """Return True, the counters are most useful while polls fail."""
+        return True
 
-        return None
+    @property
+    def native_value(self) -> StateType | datetime:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator)
@@ -0,0 +1,333 @@
+"""Services of the petTracer integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.components.zone import async_active_zone
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import dt as dt_util, slugify
+from pettracer import PetTracerError
+
+from .capture import CAPTURE_DIR
+from .const import (
+    CAPTURE_DURATION,
+    CAPTURE_MAX_DURATION,
+    DATA_SCHEDULER,
+    DOMAIN,
+    EVENT_EXPORT_FINISHED,
+    LIVE_TRACKING_DURATION,
+    LIVE_TRACKING_MAX_DURATION,
+)
+from .export import (
+    EXPORT_DIR,
+    EXPORT_FORMATS,
+    FORMAT_GPX,
+    iter_geojson,
+    iter_gpx,
+    write_track,
+)
+from .history import PositionHistory
+from .places import Place
+
+if TYPE_CHECKING:
+    from . import PetTracerDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_EXPORT_TRACK = "export_track"
+SERVICE_START_LIVE_TRACKING = "start_live_tracking"
+SERVICE_STOP_LIVE_TRACKING = "stop_live_tracking"
+SERVICE_REFRESH_COLLAR = "refresh_collar"
+SERVICE_GET_PLACES = "get_places"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FORMAT = "format"
+ATTR_DURATION = "duration"
+ATTR_COUNT = "count"
+
+EXPORT_TRACK_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_GPX): vol.In(EXPORT_FORMATS),
+    }
+)
+
+START_LIVE_TRACKING_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_DURATION, default=LIVE_TRACKING_DURATION): vol.All(
+            cv.time_period, vol.Range(max=LIVE_TRACKING_MAX_DURATION)
+        ),
+    }
+)
+
+COLLARS_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string])}
+)
+
+START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=CAPTURE_DURATION): vol.All(
+            cv.time_period, vol.Range(max=CAPTURE_MAX_DURATION)
+        ),
+    }
+)
+
+GET_PLACES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_COUNT, default=5): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=20)
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the petTracer services."""
+
+    async def async_export_track(call: ServiceCall) -> ServiceResponse:
+        """Export the position history of collars, finish in the background."""
+        start: datetime | None = call.data.get(ATTR_START)
+        end: datetime | None = call.data.get(ATTR_END)
+        start_time = dt_util.as_utc(start).timestamp() if start else 0.0
+        end_time = (
+            dt_util.as_utc(end).timestamp() if end else dt_util.utcnow().timestamp()
+        )
+        if start_time > end_time:
+            raise ServiceValidationError("The start of the export is after its end")
+
+        exports: list[dict[str, Any]] = []
+        stamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+        render = iter_gpx if call.data[ATTR_FORMAT] == FORMAT_GPX else iter_geojson
+        for device_id in call.data[ATTR_DEVICE_ID]:
+            coordinator, collar_id = async_get_collar(hass, device_id)
+            view = coordinator.views.get(collar_id)
+            name = view.name if view else f"Pet Tracker {collar_id}"
+            # Copy the range, the history keeps changing on the loop while
+            # the file is written in the executor
+            fixes = (
+                history.window(start_time, end_time)
+                if (history := coordinator.history.get(collar_id))
+                else PositionHistory(1)
+            )
+            path = Path(
+                hass.config.path(
+                    EXPORT_DIR,
+                    # Pets can share a name, the collar id keeps files apart
+                    f"{slugify(name)}_{collar_id}_{stamp}.{call.data[ATTR_FORMAT]}",
+                )
+            )
+            count = len(fixes)
+            hass.async_create_background_task(
+                _async_write(
+                    hass,
+                    collar_id,
+                    path,
+                    render(name, fixes.iter_range(start_time, end_time)),
+                    count,
+                ),
+                f"{DOMAIN}_export_{collar_id}",
+            )
+            exports.append({"collar_id": collar_id, "path": str(path), "fixes": count})
+
+        return {"exports": exports}
+
+    async def async_start_live_tracking(call: ServiceCall) -> ServiceResponse:
+        """Poll collars on their own every few seconds for a while."""
+        # Resolve all collars first, so a typo starts none of them
+        collars = [
+            async_get_collar(hass, device_id)
+            for device_id in call.data[ATTR_DEVICE_ID]
+        ]
+        return {
+            "collars": [
+                {
+                    "collar_id": collar_id,
+                    "until": coordinator.async_start_live_tracking(
+                        collar_id, call.data[ATTR_DURATION]
+                    ).isoformat(),
+                }
+                for coordinator, collar_id in collars
+            ]
+        }
+
+    async def async_stop_live_tracking(call: ServiceCall) -> None:
+        """Stop live tracking collars before their time is up."""
+        for device_id in call.data[ATTR_DEVICE_ID]:
+            coordinator, collar_id = async_get_collar(hass, device_id)
+            coordinator.async_stop_live_tracking(collar_id)
+
+    async def async_refresh_collar(call: ServiceCall) -> None:
+        """Fetch collars on their own, without refreshing their accounts."""
+        collars: dict[PetTracerDataUpdateCoordinator, list[Any]] = {}
+        for device_id in call.data[ATTR_DEVICE_ID]:
+            coordinator, collar_id = async_get_collar(hass, device_id)
+            collars.setdefault(coordinator, []).append(collar_id)
+        try:
+            for coordinator, collar_ids in collars.items():
+                await coordinator.async_refresh_collars(collar_ids)
+        except PetTracerError as err:
+            raise HomeAssistantError(f"Failed to refresh collars: {err}") from err
+
+    async def async_get_places(call: ServiceCall) -> ServiceResponse:
+        """Return where collars spent the most time recently."""
+        now = dt_util.utcnow().timestamp()
+        collars: list[dict[str, Any]] = []
+        for device_id in call.data[ATTR_DEVICE_ID]:
+            coordinator, collar_id = async_get_collar(hass, device_id)
+            view = coordinator.views.get(collar_id)
+            tracker = coordinator.places.get(collar_id)
+            places = tracker.places(call.data[ATTR_COUNT], now) if tracker else []
+            collars.append(
+                {
+                    "collar_id": collar_id,
+                    "name": view.name if view else f"Pet Tracker {collar_id}",
+                    "places": [
+                        _describe_place(hass, coordinator, place)
+                        for place in places
+                    ],
+                }
+            )
+        return {"collars": collars}
+
+    async def async_start_capture(call: ServiceCall) -> ServiceResponse:
+        """Record the raw API traffic of all accounts for a while."""
+        if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+            raise ServiceValidationError("No petTracer account is set up")
+        if scheduler.capture.active:
+            raise ServiceValidationError(
+                f"Already capturing to {scheduler.capture.path}"
+            )
+        path = Path(
+            hass.config.path(
+                CAPTURE_DIR,
+                f"capture_{dt_util.utcnow().strftime('%Y%m%d%H%M%S')}.jsonl.gz",
+            )
+        )
+        scheduler.capture.async_start(hass, path, call.data[ATTR_DURATION])
+        return {"path": str(path), "until": scheduler.capture.until.isoformat()}
+
+    async def async_stop_capture(call: ServiceCall) -> None:
+        """Stop recording the API traffic before the time is up."""
+        if (scheduler := hass.data.get(DATA_SCHEDULER)) is not None:
+            await scheduler.capture.async_stop()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_TRACK,
+        async_export_track,
+        schema=EXPORT_TRACK_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_LIVE_TRACKING,
+        async_start_live_tracking,
+        schema=START_LIVE_TRACKING_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_LIVE_TRACKING,
+        async_stop_live_tracking,
+        schema=COLLARS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_COLLAR,
+        async_refresh_collar,
+        schema=COLLARS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PLACES,
+        async_get_places,
+        schema=GET_PLACES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_CAPTURE,
+        async_start_capture,
+        schema=START_CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_CAPTURE,
+        async_stop_capture,
+    )
+
+
+def async_get_collar(
+    hass: HomeAssistant, device_id: str
+) -> tuple[PetTracerDataUpdateCoordinator, Any]:
+    """Return the coordinator and collar id of a collar device."""
+    device = dr.async_get(hass).async_get(device_id)
+    identifiers = {
+        str(identifier)
+        for domain, identifier in (device.identifiers if device else ())
+        if domain == DOMAIN
+    }
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        for collar_id in coordinator.data or {}:
+            if str(collar_id) in identifiers:
+                return coordinator, collar_id
+    raise ServiceValidationError(f"Device {device_id} is not a petTracer collar")
+
+
+def _describe_place(
+    hass: HomeAssistant, coordinator: PetTracerDataUpdateCoordinator, place: Place
+) -> dict[str, Any]:
+    """Return a frequented place and the zones it lies in."""
+    zone = async_active_zone(hass, place.latitude, place.longitude)
+    fences = coordinator.geofences.lookup(place.latitude, place.longitude)
+    return {
+        "latitude": round(place.latitude, 6),
+        "longitude": round(place.longitude, 6),
+        "dwell_hours": round(place.dwell / 3600, 1),
+        "share": round(place.share, 3),
+        "zone": zone.name if zone else None,
+        "geofence": fences[0].name if fences else None,
+    }
+
+
+async def _async_write(
+    hass: HomeAssistant,
+    collar_id: Any,
+    path: Path,
+    chunks: Iterable[str],
+    count: int,
+) -> None:
+    """Write an export in the executor and announce it when done."""
+    try:
+        await hass.async_add_executor_job(write_track, path, chunks)
+    except OSError as err:
+        _LOGGER.error("Failed to export the track of collar %s: %s", collar_id, err)
+        return
+    _LOGGER.info("Exported %d fixes of collar %s to %s", count, collar_id, path)
+    hass.bus.async_fire(
+        EVENT_EXPORT_FINISHED,
+        {"collar_id": collar_id, "path": str(path), "fixes": count},
+    )
@@ -0,0 +1,46 @@
+"""Persistence of the last known petTracer state between restarts."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import datetime
+import logging
+from typing import Any
+
+from pettracer import Device
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def device_to_json(device: Device) -> dict[str, Any]:
+    """Convert a Device into a JSON serializable dict."""
+    return _to_json(asdict(device))
+
+
+def devices_from_json(items: list[dict[str, Any]]) -> dict[int, Device]:
+    """Rebuild the coordinator data from stored devices.
+
+    Devices that can no longer be parsed are skipped, they will be fetched
+    again on the next refresh.
+    """
+    data = {}
+    for item in items:
+        try:
+            device = Device.from_dict(item)
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.debug("Skipping stored device that cannot be parsed: %s", err)
+            continue
+        if device.id:
+            data[device.id] = device
+    return data
+
+
+def _to_json(value: Any) -> Any:
+    """Recursively convert datetimes into strings the client can parse back."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    return value
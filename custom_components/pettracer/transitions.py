@@ -0,0 +1,169 @@
+"""Transitions between consecutive refreshes of petTracer collars."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from .const import (
+    EVENT_BATTERY_LOW,
+    EVENT_BATTERY_RECOVERED,
+    EVENT_CHARGING_STARTED,
+    EVENT_CHARGING_STOPPED,
+    EVENT_COLLAR_RECONNECTED,
+    EVENT_COLLAR_SILENT,
+    EVENT_LIVE_TRACKING_STARTED,
+    EVENT_LIVE_TRACKING_STOPPED,
+    EVENT_TRACKING_MODE_CHANGED,
+)
+from .model import CollarView
+
+# Points (%) a low battery has to rise above the threshold before it counts
+# as recovered. The level follows the voltage, which wobbles by a few mV and
+# would otherwise cross the threshold back and forth.
+BATTERY_HYSTERESIS = 5
+
+Transition = tuple[str, dict[str, Any]]
+
+
+@dataclass(frozen=True, slots=True)
+class CollarState:
+    """The parts of a collar whose changes are announced as events.
+
+    ``None`` means unknown, changes from or to unknown are not announced.
+    """
+
+    charging: bool | None
+    battery_low: bool | None
+    search: bool | None
+    tracking_mode: str | None
+    silent: bool | None
+
+
+class TransitionEngine:
+    """Compare each collar with its previous refresh and name what changed.
+
+    Only the few values the events are about are kept per collar, so a
+    refresh costs a comparison of two small tuples per collar instead of
+    every automation re-evaluating templates against the entity states.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without any previous state."""
+        self._states: dict[str, CollarState] = {}
+
+    def update(
+        self,
+        device_id: str,
+        view: CollarView,
+        now: datetime,
+        battery_threshold: int,
+        silent_after: timedelta | None,
+    ) -> list[Transition]:
+        """Store the state of a collar, return the transitions since the last.
+
+        Nothing is returned for the first state of a collar, there is
+        nothing to compare it with.
+        """
+        previous = self._states.get(device_id)
+        state = CollarState(
+            charging=(
+                None
+                if view.charging_status is None
+                else view.charging_status == "Charging"
+            ),
+            battery_low=_battery_low(
+                view.battery_level,
+                battery_threshold,
+                previous.battery_low if previous else None,
+            ),
+            search=None if view.search_status is None else view.search_status == "On",
+            tracking_mode=view.tracking_mode,
+            silent=(
+                None
+                if view.last_contact is None or not silent_after
+                else now - view.last_contact >= silent_after
+            ),
+        )
+        self._states[device_id] = state
+        if previous is None or previous == state:
+            return []
+
+        event_data = {"collar_id": device_id, "name": view.name}
+        transitions: list[Transition] = []
+        if _changed(previous.charging, state.charging):
+            transitions.append(
+                (
+                    EVENT_CHARGING_STARTED
+                    if state.charging
+                    else EVENT_CHARGING_STOPPED,
+                    {**event_data, "battery_level": view.battery_level},
+                )
+            )
+        if _changed(previous.battery_low, state.battery_low):
+            transitions.append(
+                (
+                    EVENT_BATTERY_LOW if state.battery_low else EVENT_BATTERY_RECOVERED,
+                    {
+                        **event_data,
+                        "battery_level": view.battery_level,
+                        "threshold": battery_threshold,
+                    },
+                )
+            )
+        if _changed(previous.search, state.search):
+            transitions.append(
+                (
+                    EVENT_LIVE_TRACKING_STARTED
+                    if state.search
+                    else EVENT_LIVE_TRACKING_STOPPED,
+                    event_data,
+                )
+            )
+        if _changed(previous.tracking_mode, state.tracking_mode):
+            transitions.append(
+                (
+                    EVENT_TRACKING_MODE_CHANGED,
+                    {
+                        **event_data,
+                        "from": previous.tracking_mode,
+                        "to": state.tracking_mode,
+                    },
+                )
+            )
+        if _changed(previous.silent, state.silent):
+            transitions.append(
+                (
+                    EVENT_COLLAR_SILENT if state.silent else EVENT_COLLAR_RECONNECTED,
+                    {
+                        **event_data,
+                        "last_contact": view.last_contact.isoformat()
+                        if view.last_contact
+                        else None,
+                    },
+                )
+            )
+        return transitions
+
+    def retain(self, device_ids: Iterable[str]) -> None:
+        """Forget collars that are no longer part of the account."""
+        for device_id in self._states.keys() - set(device_ids):
+            del self._states[device_id]
+
+
+def _changed(previous: Any, current: Any) -> bool:
+    """Return whether a known value changed into another known value."""
+    return previous is not None and current is not None and previous != current
+
+
+def _battery_low(
+    level: int | None, threshold: int, was_low: bool | None
+) -> bool | None:
+    """Return whether a battery level counts as low."""
+    if level is None or not threshold:
+        return None
+    if was_low:
+        return level < threshold + BATTERY_HYSTERESIS
+    return level < threshold